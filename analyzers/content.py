@@ -1,7 +1,58 @@
 """内容分析器"""
 
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+
 from models import PageData, Finding, Category, Severity
 
+# 功能性页面路径，不需要大量文字内容
+_FUNCTIONAL_PATHS = (
+    "/register", "/login", "/signup", "/signin",
+    "/cart", "/checkout", "/account", "/profile",
+    "/reset-password", "/forgot-password", "/verify",
+    "/unsubscribe", "/settings", "/dashboard",
+)
+
+
+def _url_path_lower(url: str) -> str:
+    """取 URL 的 path（去掉尾部斜杠并转小写）
+
+    只做字符串切分，省去 urlparse 构造 ParseResult 和校验 scheme/netloc 的开销。
+    """
+    # 先去掉 fragment 和 query，避免其中的 "/" 被当成 path
+    url = url.split("#", 1)[0].split("?", 1)[0]
+    start = url.find("//")
+    slash = url.find("/", start + 2 if start >= 0 else 0)
+    if slash < 0:
+        return ""
+    path = url[slash:]
+    # 与 urlparse 一致：最后一段中的 ;params 不属于 path
+    semi = path.find(";", path.rfind("/"))
+    if semi >= 0:
+        path = path[:semi]
+    return path.rstrip("/").lower()
+
+
+@dataclass
+class _ContentStats:
+    """单次遍历 pages 得到的聚合数据，供各项检查复用"""
+    total: int = 0
+    ok: int = 0
+    err: int = 0
+    no_resp: int = 0
+    dead_links: list[str] = field(default_factory=list)
+    thin_pages: list[tuple[str, int]] = field(default_factory=list)
+    # 字数：流式累计总数 / 个数 / 最小 / 最大，不保留逐页列表
+    wc_total: int = 0
+    wc_count: int = 0
+    wc_min: int = 0
+    wc_max: int = 0
+    inbound: Counter = field(default_factory=Counter)
+    internal_link_total: int = 0
+    pages_200_count: int = 0
+    title_counts: Counter = field(default_factory=Counter)
+
 
 class ContentAnalyzer:
     def __init__(self, pages: dict[str, PageData], base_url: str):
@@ -9,35 +60,75 @@ class ContentAnalyzer:
         self.base_url = base_url
 
     def analyze(self) -> list[Finding]:
+        stats = self._collect()
         findings = []
-        findings.extend(self._check_page_stats())
-        findings.extend(self._check_dead_links())
-        findings.extend(self._check_word_counts())
-        findings.extend(self._check_link_graph())
-        findings.extend(self._check_duplicate_titles())
+        findings.extend(self._check_page_stats(stats))
+        findings.extend(self._check_dead_links(stats))
+        findings.extend(self._check_word_counts(stats))
+        findings.extend(self._check_link_graph(stats))
+        findings.extend(self._check_duplicate_titles(stats))
         return findings
 
-    def _check_page_stats(self) -> list[Finding]:
-        total = len(self.pages)
-        ok = sum(1 for p in self.pages.values() if p.status_code == 200)
-        err = sum(1 for p in self.pages.values() if p.status_code >= 400)
-        no_resp = sum(1 for p in self.pages.values() if p.status_code == 0)
+    def _collect(self) -> _ContentStats:
+        """只遍历一次 pages，汇总各项检查所需的数据"""
+        stats = _ContentStats(total=len(self.pages))
+        # 局部绑定，循环内免去全局查找和方法属性查找
+        url_path = _url_path_lower
+        pages = self.pages
+        dead_append = stats.dead_links.append
+        thin_append = stats.thin_pages.append
+        inbound_update = stats.inbound.update
+        title_counts = stats.title_counts
+
+        for url, page in pages.items():
+            # 页面状态统计 / 死链（同一次分支判断完成）
+            sc = page.status_code
+            if sc == 200:
+                stats.ok += 1
+            elif sc >= 400:
+                stats.err += 1
+                dead_append(url if sc == 404 else f"{url} ({sc})")
+                continue
+            else:
+                if sc == 0:
+                    stats.no_resp += 1
+                continue
 
+            # 字数
+            wc = page.word_count
+            if wc > 0:
+                if stats.wc_count == 0 or wc < stats.wc_min:
+                    stats.wc_min = wc
+                if wc > stats.wc_max:
+                    stats.wc_max = wc
+                stats.wc_total += wc
+                stats.wc_count += 1
+                path = url_path(url)
+                # endswith 接受 tuple，一次 C 调用完成全部后缀比较（相等是其特例）
+                if not path.endswith(_FUNCTIONAL_PATHS) and wc < 300:
+                    thin_append((url, wc))
+
+            # 链接图（只统计指向已爬取页面的入链）
+            stats.pages_200_count += 1
+            stats.internal_link_total += len(page.internal_links)
+            inbound_update(link for link in page.internal_links if link in pages)
+
+            # 标题（只计数，不为每个标题分配 URL 列表）
+            if page.title:
+                title_counts[page.title] += 1
+
+        return stats
+
+    def _check_page_stats(self, stats: _ContentStats) -> list[Finding]:
         return [Finding(
             category=Category.CONTENT, severity=Severity.INFO,
             title="页面统计",
-            description=f"共爬取 {total} 个页面：{ok} 个正常，{err} 个错误，{no_resp} 个无响应",
+            description=f"共爬取 {stats.total} 个页面：{stats.ok} 个正常，{stats.err} 个错误，{stats.no_resp} 个无响应",
         )]
 
-    def _check_dead_links(self) -> list[Finding]:
+    def _check_dead_links(self, stats: _ContentStats) -> list[Finding]:
         findings = []
-        dead_links = []
-
-        for url, page in self.pages.items():
-            if page.status_code == 404:
-                dead_links.append(url)
-            elif page.status_code >= 400:
-                dead_links.append(f"{url} ({page.status_code})")
+        dead_links = stats.dead_links
 
         if dead_links:
             desc_lines = [f"  - {link}" for link in dead_links[:10]]
@@ -56,31 +147,14 @@ class ContentAnalyzer:
 
         return findings
 
-    def _check_word_counts(self) -> list[Finding]:
+    def _check_word_counts(self, stats: _ContentStats) -> list[Finding]:
         findings = []
-        thin_pages = []
-
-        # 功能性页面路径，不需要大量文字内容
-        functional_paths = (
-            "/register", "/login", "/signup", "/signin",
-            "/cart", "/checkout", "/account", "/profile",
-            "/reset-password", "/forgot-password", "/verify",
-            "/unsubscribe", "/settings", "/dashboard",
-        )
-
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
-            from urllib.parse import urlparse
-            path = urlparse(url).path.rstrip("/").lower()
-            if any(path == fp or path.endswith(fp) for fp in functional_paths):
-                continue
-            if page.word_count < 300 and page.word_count > 0:
-                thin_pages.append((url, page.word_count))
+        thin_pages = stats.thin_pages
 
         if thin_pages:
-            thin_pages.sort(key=lambda x: x[1])
-            desc_lines = [f"  - {url} ({count} 字)" for url, count in thin_pages[:10]]
+            # 只需最少的 10 个，用堆取 top-K 代替全量排序
+            top_thin = heapq.nsmallest(10, thin_pages, key=lambda x: x[1])
+            desc_lines = [f"  - {url} ({count} 字)" for url, count in top_thin]
             findings.append(Finding(
                 category=Category.CONTENT, severity=Severity.WARNING,
                 title=f"{len(thin_pages)} 个页面内容过少（<300 字）",
@@ -89,33 +163,24 @@ class ContentAnalyzer:
             ))
 
         # 统计平均字数
-        word_counts = [p.word_count for p in self.pages.values() if p.status_code == 200 and p.word_count > 0]
-        if word_counts:
-            avg = sum(word_counts) / len(word_counts)
+        if stats.wc_count:
+            avg = stats.wc_total / stats.wc_count
             findings.append(Finding(
                 category=Category.CONTENT, severity=Severity.INFO,
                 title="内容字数统计",
-                description=f"平均 {avg:.0f} 字/页，最少 {min(word_counts)} 字，最多 {max(word_counts)} 字",
+                description=f"平均 {avg:.0f} 字/页，最少 {stats.wc_min} 字，最多 {stats.wc_max} 字",
             ))
 
         return findings
 
-    def _check_link_graph(self) -> list[Finding]:
+    def _check_link_graph(self, stats: _ContentStats) -> list[Finding]:
         findings = []
-
-        # 计算入链数
-        inbound: dict[str, int] = {url: 0 for url in self.pages}
-        for page in self.pages.values():
-            if page.status_code != 200:
-                continue
-            for link in page.internal_links:
-                if link in inbound:
-                    inbound[link] += 1
+        inbound = stats.inbound
 
         # 孤立页面（无入链，排除首页）
         orphans = [
-            url for url, count in inbound.items()
-            if count == 0 and url != self.base_url and self.pages[url].status_code == 200
+            url for url, page in self.pages.items()
+            if page.status_code == 200 and url != self.base_url and inbound.get(url, 0) == 0
         ]
 
         if orphans:
@@ -128,10 +193,8 @@ class ContentAnalyzer:
             ))
 
         # 出链统计
-        avg_internal = 0
-        pages_200 = [p for p in self.pages.values() if p.status_code == 200]
-        if pages_200:
-            avg_internal = sum(len(p.internal_links) for p in pages_200) / len(pages_200)
+        if stats.pages_200_count:
+            avg_internal = stats.internal_link_total / stats.pages_200_count
             findings.append(Finding(
                 category=Category.CONTENT, severity=Severity.INFO,
                 title="内部链接统计",
@@ -140,18 +203,13 @@ class ContentAnalyzer:
 
         return findings
 
-    def _check_duplicate_titles(self) -> list[Finding]:
-        title_pages: dict[str, list[str]] = {}
-        for url, page in self.pages.items():
-            if page.status_code == 200 and page.title:
-                title_pages.setdefault(page.title, []).append(url)
-
+    def _check_duplicate_titles(self, stats: _ContentStats) -> list[Finding]:
         findings = []
-        duplicates = {t: urls for t, urls in title_pages.items() if len(urls) > 1}
+        duplicates = {t: n for t, n in stats.title_counts.items() if n > 1}
         if duplicates:
             desc_lines = []
-            for title, urls in list(duplicates.items())[:5]:
-                desc_lines.append(f"  '{title}' ({len(urls)} 个页面)")
+            for title, count in list(duplicates.items())[:5]:
+                desc_lines.append(f"  '{title}' ({count} 个页面)")
             findings.append(Finding(
                 category=Category.CONTENT, severity=Severity.WARNING,
                 title=f"{len(duplicates)} 组重复标题",
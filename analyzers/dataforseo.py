@@ -18,17 +18,52 @@ Base URL: https://api.dataforseo.com/v3/
     DATAFORSEO_PASSWORD=your_password
 """
 
-import json
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from models import Finding, Category, Severity
+from utils import json_loads, json_dumps
+
+# DataForSEO checks 中为 true 表示存在问题的检查项 -> (描述, 严重程度, 类别)
+_PROBLEM_CHECKS: dict[str, tuple[str, Severity, Category]] = {
+    "no_title": ("缺少 title 标签", Severity.ERROR, Category.SEO),
+    "no_description": ("缺少 meta description", Severity.WARNING, Category.SEO),
+    "no_h1_tag": ("缺少 H1 标签", Severity.ERROR, Category.SEO),
+    "has_meta_refresh_redirect": ("使用了 meta refresh 重定向", Severity.WARNING, Category.SEO),
+    "is_broken": ("页面已损坏", Severity.ERROR, Category.CONTENT),
+    "no_image_alt": ("图片缺少 alt 属性", Severity.WARNING, Category.SEO),
+    "no_image_title": ("图片缺少 title 属性", Severity.INFO, Category.SEO),
+    "no_favicon": ("缺少 favicon", Severity.WARNING, Category.SEO),
+    "no_content_encoding": ("未启用内容压缩", Severity.WARNING, Category.PERFORMANCE),
+    "high_loading_time": ("页面加载时间过长", Severity.ERROR, Category.PERFORMANCE),
+    "is_http": ("使用 HTTP 而非 HTTPS", Severity.ERROR, Category.SECURITY),
+    "low_content_rate": ("内容占比过低（纯文本占比低）", Severity.WARNING, Category.CONTENT),
+    "high_waiting_time": ("服务器等待时间过长", Severity.WARNING, Category.PERFORMANCE),
+    "no_doctype": ("缺少 DOCTYPE 声明", Severity.WARNING, Category.SEO),
+    "title_too_short": ("title 标签过短", Severity.WARNING, Category.SEO),
+    "title_too_long": ("title 标签过长", Severity.WARNING, Category.SEO),
+    "has_render_blocking_resources": ("存在渲染阻塞资源", Severity.WARNING, Category.PERFORMANCE),
+    "https_to_http_links": ("HTTPS 页面包含 HTTP 链接", Severity.ERROR, Category.SECURITY),
+    "size_greater_than_3mb": ("页面大于 3MB", Severity.ERROR, Category.PERFORMANCE),
+    "duplicate_title_tag": ("重复的 title 标签", Severity.WARNING, Category.SEO),
+    "duplicate_meta_tags": ("重复的 meta 标签", Severity.WARNING, Category.SEO),
+    "deprecated_html_tags": ("使用了已废弃的 HTML 标签", Severity.WARNING, Category.SEO),
+}
 
 
 class DataForSEOClient:
     """DataForSEO API 客户端"""
 
     BASE_URL = "https://api.dataforseo.com/v3"
+    INSTANT_PAGES_BATCH_SIZE = 20
 
-    def __init__(self, login: str, password: str, sandbox: bool = False):
+    def __init__(self, login: str, password: str, sandbox: bool = False,
+                 cache_dir: str = "", cache_ttl: float = 24 * 3600):
         self.auth = (login, password)
         if sandbox:
             self.BASE_URL = "https://sandbox.dataforseo.com/v3"
@@ -37,20 +72,68 @@ class DataForSEOClient:
         self.session.headers.update({
             "Content-Type": "application/json",
         })
+        # 连接池复用 TLS 连接；429/5xx 自动退避重试（API 限速 2000 请求/分钟）。
+        # POST 按次计费且不幂等：read=0，读取超时/失败的请求不重发，避免重复扣费
+        retry = Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self.session.mount("https://", adapter)
+        # 响应缓存：(endpoint, key) -> (写入时间, 数据)，避免重复付费调用
+        # cache_dir 非空时同时落盘，跨进程复用
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self._cache: dict[tuple[str, str], tuple[float, dict]] = {}
+
+    def _cache_path(self, endpoint: str, key: str) -> str:
+        digest = hashlib.sha1(f"{self.BASE_URL}{endpoint}|{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _cache_get(self, endpoint: str, key: str) -> dict | None:
+        """读取未过期的缓存，内存未命中时回落到磁盘"""
+        entry = self._cache.get((endpoint, key))
+        if entry is None and self.cache_dir:
+            try:
+                with open(self._cache_path(endpoint, key), "rb") as f:
+                    stored = json_loads(f.read())
+                entry = (stored["ts"], stored["data"])
+                self._cache[(endpoint, key)] = entry
+            except (OSError, ValueError, KeyError):
+                return None
+        if entry is None or time.time() - entry[0] > self.cache_ttl:
+            return None
+        return entry[1]
+
+    def _cache_put(self, endpoint: str, key: str, data: dict):
+        ts = time.time()
+        self._cache[(endpoint, key)] = (ts, data)
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # 与请求体相同，直接写入 json_dumps 得到的 UTF-8 字节
+                with open(self._cache_path(endpoint, key), "wb") as f:
+                    f.write(json_dumps({"ts": ts, "data": data}))
+            except OSError as e:
+                print(f"  ⚠️ DataForSEO 缓存写入失败: {e}")
 
     def _post(self, endpoint: str, data: list[dict]) -> dict:
         """发送 POST 请求"""
         url = f"{self.BASE_URL}{endpoint}"
-        resp = self.session.post(url, json=data, timeout=60)
+        # Content-Type 已在 session 上设置为 application/json
+        resp = self.session.post(url, data=json_dumps(data), timeout=60)
         resp.raise_for_status()
-        return resp.json()
+        return json_loads(resp.content)
 
     def _get(self, endpoint: str) -> dict:
         """发送 GET 请求"""
         url = f"{self.BASE_URL}{endpoint}"
         resp = self.session.get(url, timeout=60)
         resp.raise_for_status()
-        return resp.json()
+        return json_loads(resp.content)
 
     def instant_pages(self, url: str) -> dict | None:
         """实时单页分析 - 返回 onpage_score、Core Web Vitals、SEO 检查项
@@ -61,26 +144,49 @@ class DataForSEOClient:
 
         返回结构: result[0].items[0] 包含页面级数据
         """
-        data = [{
-            "url": url,
-            "enable_javascript": True,
-            "load_resources": True,
-            "check_spell": True,
-            "validate_micromarkup": True,
-        }]
-        try:
-            resp = self._post("/on_page/instant_pages", data)
-            if resp.get("status_code") == 20000 and resp.get("tasks"):
-                task = resp["tasks"][0]
-                if task.get("status_code") == 20000 and task.get("result"):
-                    result = task["result"][0]
-                    # 实际页面数据在 items 数组中
-                    items = result.get("items", [])
-                    if items:
-                        return items[0]
-                    return result
-        except Exception as e:
-            print(f"  ⚠️ DataForSEO instant_pages 失败: {e}")
+        return self.instant_pages_batch([url])[0]
+
+    def instant_pages_batch(self, urls: list[str]) -> list[dict | None]:
+        """批量实时页面分析 - 一次 POST 提交多个任务，结果按 urls 顺序返回
+
+        单次请求最多 INSTANT_PAGES_BATCH_SIZE 个任务，超出部分分批提交。
+        已缓存的 URL 不再请求。
+        """
+        endpoint = "/on_page/instant_pages"
+        results: list[dict | None] = [self._cache_get(endpoint, url) for url in urls]
+        missing = [i for i, r in enumerate(results) if r is None]
+        for start in range(0, len(missing), self.INSTANT_PAGES_BATCH_SIZE):
+            chunk = missing[start:start + self.INSTANT_PAGES_BATCH_SIZE]
+            data = [{
+                "url": urls[i],
+                "enable_javascript": True,
+                "load_resources": True,
+                "check_spell": True,
+                "validate_micromarkup": True,
+            } for i in chunk]
+            try:
+                resp = self._post(endpoint, data)
+                if resp.get("status_code") == 20000 and resp.get("tasks"):
+                    # tasks 与提交顺序一致
+                    for i, task in zip(chunk, resp["tasks"]):
+                        page = self._extract_instant_page(task)
+                        if page is not None:
+                            self._cache_put(endpoint, urls[i], page)
+                        results[i] = page
+            except Exception as e:
+                print(f"  ⚠️ DataForSEO instant_pages 失败: {e}")
+        return results
+
+    @staticmethod
+    def _extract_instant_page(task: dict) -> dict | None:
+        """从单个 instant_pages 任务中取出页面数据"""
+        if task.get("status_code") == 20000 and task.get("result"):
+            result = task["result"][0]
+            # 实际页面数据在 items 数组中
+            items = result.get("items", [])
+            if items:
+                return items[0]
+            return result
         return None
 
     def backlinks_summary(self, target: str) -> dict | None:
@@ -90,16 +196,22 @@ class DataForSEOClient:
         费用: $0.02/请求 + $0.00003/每行数据
         注意: Backlinks API 有 $100/月最低消费（Make.com/n8n 除外）
         """
+        endpoint = "/backlinks/summary/live"
+        cached = self._cache_get(endpoint, target)
+        if cached is not None:
+            return cached
         data = [{
             "target": target,
             "exclude_internal_backlinks": True,
         }]
         try:
-            resp = self._post("/backlinks/summary/live", data)
+            resp = self._post(endpoint, data)
             if resp.get("status_code") == 20000 and resp.get("tasks"):
                 task = resp["tasks"][0]
                 if task.get("status_code") == 20000 and task.get("result"):
-                    return task["result"][0] if isinstance(task["result"], list) else task["result"]
+                    result = task["result"][0] if isinstance(task["result"], list) else task["result"]
+                    self._cache_put(endpoint, target, result)
+                    return result
                 elif task.get("status_code") == 40204:
                     print(f"  ⚠️ Backlinks API 未开通（需要订阅）")
                     return None
@@ -111,37 +223,58 @@ class DataForSEOClient:
 class DataForSEOAnalyzer:
     """利用 DataForSEO API 进行深度分析"""
 
-    def __init__(self, client: DataForSEOClient, target_url: str):
+    def __init__(self, client: DataForSEOClient, target_url: str,
+                 urls: list[str] | None = None):
         self.client = client
         self.target_url = target_url
+        # 需要页面级分析的 URL，默认只分析首页
+        self.urls = urls or [target_url]
         # 从 URL 提取域名
         from urllib.parse import urlparse
         self.domain = urlparse(target_url).netloc
 
     def analyze(self) -> list[Finding]:
-        findings = []
-
-        # 1. 页面级分析
-        print("  📡 DataForSEO: 分析首页...")
-        page_data = self.client.instant_pages(self.target_url)
-        if page_data:
-            findings.extend(self._parse_instant_pages(page_data))
+        # 页面分析与反链分析互不依赖，并发请求，总耗时取两者较慢者
+        if len(self.urls) > 1:
+            print(f"  📡 DataForSEO: 批量分析 {len(self.urls)} 个页面...")
         else:
-            findings.append(Finding(
-                category=Category.SEO, severity=Severity.INFO,
-                title="DataForSEO 页面分析不可用",
-                description="无法通过 DataForSEO API 获取页面数据",
-            ))
-
-        # 2. 反链分析
+            print("  📡 DataForSEO: 分析首页...")
         print("  📡 DataForSEO: 分析反向链接...")
-        backlinks = self.client.backlinks_summary(self.domain)
-        if backlinks:
-            findings.extend(self._parse_backlinks(backlinks))
-
-        return findings
-
-    def _parse_instant_pages(self, data: dict) -> list[Finding]:
+        page_findings: list[Finding] = []
+        backlink_findings: list[Finding] = []
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = {
+                pool.submit(self._fetch_pages): "page",
+                pool.submit(self.client.backlinks_summary, self.domain): "backlinks",
+            }
+            # 先返回的先解析
+            for future in as_completed(futures):
+                data = future.result()
+                if futures[future] == "page":
+                    # 1. 页面级分析
+                    for url, page_data in zip(self.urls, data):
+                        if page_data:
+                            page_findings.extend(self._parse_instant_pages(page_data, url))
+                        else:
+                            page_findings.append(Finding(
+                                category=Category.SEO, severity=Severity.INFO,
+                                title="DataForSEO 页面分析不可用",
+                                description="无法通过 DataForSEO API 获取页面数据",
+                                url=url if len(self.urls) > 1 else "",
+                            ))
+                elif data:
+                    # 2. 反链分析
+                    backlink_findings = self._parse_backlinks(data)
+
+        return page_findings + backlink_findings
+
+    def _fetch_pages(self) -> list[dict | None]:
+        """多个 URL 合并为一次批量请求，单个 URL 走 instant_pages"""
+        if len(self.urls) > 1:
+            return self.client.instant_pages_batch(self.urls)
+        return [self.client.instant_pages(self.urls[0])]
+
+    def _parse_instant_pages(self, data: dict, url: str) -> list[Finding]:
         findings = []
 
         # OnPage 评分
@@ -157,45 +290,21 @@ class DataForSEOAnalyzer:
                 category=Category.SEO, severity=severity,
                 title=f"[DataForSEO] OnPage 评分: {onpage_score:.1f}/100",
                 description="基于 DataForSEO 专业评估的页面优化得分",
-                url=self.target_url,
+                url=url,
             ))
 
         # 检查项（true = 问题存在）
         checks = data.get("checks", {})
-        # 这些 check 的 true 表示有问题
-        problem_checks = {
-            "no_title": ("缺少 title 标签", Severity.ERROR, Category.SEO),
-            "no_description": ("缺少 meta description", Severity.WARNING, Category.SEO),
-            "no_h1_tag": ("缺少 H1 标签", Severity.ERROR, Category.SEO),
-            "has_meta_refresh_redirect": ("使用了 meta refresh 重定向", Severity.WARNING, Category.SEO),
-            "is_broken": ("页面已损坏", Severity.ERROR, Category.CONTENT),
-            "no_image_alt": ("图片缺少 alt 属性", Severity.WARNING, Category.SEO),
-            "no_image_title": ("图片缺少 title 属性", Severity.INFO, Category.SEO),
-            "no_favicon": ("缺少 favicon", Severity.WARNING, Category.SEO),
-            "no_content_encoding": ("未启用内容压缩", Severity.WARNING, Category.PERFORMANCE),
-            "high_loading_time": ("页面加载时间过长", Severity.ERROR, Category.PERFORMANCE),
-            "is_http": ("使用 HTTP 而非 HTTPS", Severity.ERROR, Category.SECURITY),
-            "low_content_rate": ("内容占比过低（纯文本占比低）", Severity.WARNING, Category.CONTENT),
-            "high_waiting_time": ("服务器等待时间过长", Severity.WARNING, Category.PERFORMANCE),
-            "no_doctype": ("缺少 DOCTYPE 声明", Severity.WARNING, Category.SEO),
-            "title_too_short": ("title 标签过短", Severity.WARNING, Category.SEO),
-            "title_too_long": ("title 标签过长", Severity.WARNING, Category.SEO),
-            "has_render_blocking_resources": ("存在渲染阻塞资源", Severity.WARNING, Category.PERFORMANCE),
-            "https_to_http_links": ("HTTPS 页面包含 HTTP 链接", Severity.ERROR, Category.SECURITY),
-            "size_greater_than_3mb": ("页面大于 3MB", Severity.ERROR, Category.PERFORMANCE),
-            "duplicate_title_tag": ("重复的 title 标签", Severity.WARNING, Category.SEO),
-            "duplicate_meta_tags": ("重复的 meta 标签", Severity.WARNING, Category.SEO),
-            "deprecated_html_tags": ("使用了已废弃的 HTML 标签", Severity.WARNING, Category.SEO),
-        }
-
-        for check_name, is_flagged in checks.items():
-            if is_flagged and check_name in problem_checks:
-                desc, sev, cat = problem_checks[check_name]
+
+        # 只遍历已知的问题项（约 20 个），不扫描 API 返回的全部检查项；
+        # 按表中顺序输出，保证结果顺序稳定
+        for check_name, (desc, sev, cat) in _PROBLEM_CHECKS.items():
+            if checks.get(check_name):
                 findings.append(Finding(
                     category=cat, severity=sev,
                     title=f"[DataForSEO] {desc}",
                     description=f"DataForSEO 检测到: {check_name}",
-                    url=self.target_url,
+                    url=url,
                 ))
 
         # 页面元数据摘要
@@ -219,7 +328,7 @@ class DataForSEOAnalyzer:
                 category=Category.SEO, severity=Severity.INFO,
                 title="[DataForSEO] 页面元数据摘要",
                 description="\n".join(f"  {d}" for d in details),
-                url=self.target_url,
+                url=url,
             ))
 
         # Core Web Vitals / 页面性能
@@ -238,7 +347,7 @@ class DataForSEOAnalyzer:
                     category=Category.PERFORMANCE, severity=severity,
                     title=f"[DataForSEO] Time to Interactive: {tti_sec:.2f}s",
                     description="页面可交互所需时间（<3s 良好，>5s 需优化）",
-                    url=self.target_url,
+                    url=url,
                 ))
 
             dom_complete = page_timing.get("dom_complete")
@@ -254,7 +363,7 @@ class DataForSEOAnalyzer:
                     category=Category.PERFORMANCE, severity=severity,
                     title=f"[DataForSEO] DOM Complete: {dom_sec:.2f}s",
                     description="DOM 加载完成时间",
-                    url=self.target_url,
+                    url=url,
                 ))
 
             # 页面总大小
@@ -265,7 +374,7 @@ class DataForSEOAnalyzer:
                     category=Category.PERFORMANCE, severity=Severity.INFO,
                     title=f"[DataForSEO] 页面大小: {total_size / 1024:.1f}KB (压缩后 {encoded_size / 1024:.1f}KB)",
                     description=f"压缩编码: {data.get('content_encoding', 'none')}",
-                    url=self.target_url,
+                    url=url,
                 ))
 
         return findings
@@ -1,13 +1,22 @@
 """性能分析器"""
 
+import heapq
+import os
+from collections import Counter
+
 from models import PageData, Finding, Category, Severity
 from utils import format_bytes
 
+# 图片扩展名 -> 统计分类
+_IMAGE_EXT_MAP = {".png": "png", ".jpg": "jpg", ".jpeg": "jpg", ".webp": "webp"}
+
 
 class PerformanceAnalyzer:
     def __init__(self, pages: dict[str, PageData], base_url: str):
         self.pages = pages
         self.base_url = base_url
+        # 各项检查只关心 200 页面，构造时筛选一次
+        self.ok_pages = {u: p for u, p in pages.items() if p.status_code == 200}
 
     def analyze(self) -> list[Finding]:
         findings = []
@@ -15,25 +24,33 @@ class PerformanceAnalyzer:
         findings.extend(self._check_page_sizes())
         findings.extend(self._check_resource_counts())
         findings.extend(self._check_image_formats())
-        findings.extend(self._check_compression())
-        findings.extend(self._check_http2())
+        # 首页相关检查共用一次查找
+        home = self.ok_pages.get(self.base_url)
+        if home:
+            findings.extend(self._check_compression(home.headers_lower))
+            findings.extend(self._check_http2(home.headers_lower))
         return findings
 
     def _check_response_times(self) -> list[Finding]:
         findings = []
         slow_pages = []
         very_slow_pages = []
-
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
-            if page.response_time > 3.0:
-                very_slow_pages.append((url, page.response_time))
-            elif page.response_time > 1.0:
-                slow_pages.append((url, page.response_time))
+        fast_count = 0
+        slow_append = slow_pages.append
+        very_slow_append = very_slow_pages.append
+
+        for url, page in self.ok_pages.items():
+            t = page.response_time
+            if t > 3.0:
+                very_slow_append((url, t))
+            elif t > 1.0:
+                slow_append((url, t))
+            else:
+                fast_count += 1
 
         if very_slow_pages:
-            desc_lines = [f"  - {url} ({t:.1f}s)" for url, t in very_slow_pages[:5]]
+            top_slow = heapq.nlargest(5, very_slow_pages, key=lambda x: x[1])
+            desc_lines = [f"  - {url} ({t:.1f}s)" for url, t in top_slow]
             findings.append(Finding(
                 category=Category.PERFORMANCE, severity=Severity.ERROR,
                 title=f"{len(very_slow_pages)} 个页面响应极慢（>3s）",
@@ -42,7 +59,8 @@ class PerformanceAnalyzer:
             ))
 
         if slow_pages:
-            desc_lines = [f"  - {url} ({t:.1f}s)" for url, t in slow_pages[:5]]
+            top_slow = heapq.nlargest(5, slow_pages, key=lambda x: x[1])
+            desc_lines = [f"  - {url} ({t:.1f}s)" for url, t in top_slow]
             findings.append(Finding(
                 category=Category.PERFORMANCE, severity=Severity.WARNING,
                 title=f"{len(slow_pages)} 个页面响应较慢（1-3s）",
@@ -50,10 +68,6 @@ class PerformanceAnalyzer:
                 recommendation="考虑使用 CDN、页面缓存或优化服务端渲染",
             ))
 
-        fast_count = sum(
-            1 for p in self.pages.values()
-            if p.status_code == 200 and p.response_time <= 1.0
-        )
         if fast_count > 0:
             findings.append(Finding(
                 category=Category.PERFORMANCE, severity=Severity.GOOD,
@@ -67,16 +81,14 @@ class PerformanceAnalyzer:
         findings = []
         large_pages = []
 
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
+        for url, page in self.ok_pages.items():
             if page.content_length > 100 * 1024:
                 large_pages.append((url, page.content_length))
 
         if large_pages:
-            large_pages.sort(key=lambda x: x[1], reverse=True)
-            desc_lines = [f"  - {url} ({format_bytes(size)})" for url, size in large_pages[:5]]
-            severity = Severity.ERROR if large_pages[0][1] > 500 * 1024 else Severity.WARNING
+            top_large = heapq.nlargest(5, large_pages, key=lambda x: x[1])
+            desc_lines = [f"  - {url} ({format_bytes(size)})" for url, size in top_large]
+            severity = Severity.ERROR if top_large[0][1] > 500 * 1024 else Severity.WARNING
             findings.append(Finding(
                 category=Category.PERFORMANCE, severity=severity,
                 title=f"{len(large_pages)} 个页面 HTML 过大（>100KB）",
@@ -94,9 +106,7 @@ class PerformanceAnalyzer:
 
     def _check_resource_counts(self) -> list[Finding]:
         findings = []
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
+        for url, page in self.ok_pages.items():
             total = len(page.scripts) + len(page.stylesheets) + len(page.images)
             if total > 50:
                 findings.append(Finding(
@@ -109,26 +119,21 @@ class PerformanceAnalyzer:
         return findings
 
     def _check_image_formats(self) -> list[Finding]:
-        png_count = 0
-        jpg_count = 0
-        webp_count = 0
         # <picture><source type="image/webp"> 包裹的 <img> 已有 WebP，
         # 其 src 保留 PNG/JPG 是正确的 fallback 写法，不应计为"未使用 WebP"
-        picture_webp_count = 0
-
-        for page in self.pages.values():
-            if page.status_code != 200:
-                continue
-            for img in page.images:
-                src = img.get("src", "").lower()
-                if img.get("has_webp_source"):
-                    picture_webp_count += 1
-                elif src.endswith(".webp"):
-                    webp_count += 1
-                elif src.endswith(".png"):
-                    png_count += 1
-                elif src.endswith((".jpg", ".jpeg")):
-                    jpg_count += 1
+        counts = Counter()
+        images = (img for p in self.ok_pages.values() for img in p.images)
+        for img in images:
+            if img.get("has_webp_source"):
+                counts["picture_webp"] += 1
+            else:
+                ext = os.path.splitext(img.get("src", "").lower())[1]
+                counts[_IMAGE_EXT_MAP.get(ext)] += 1
+
+        png_count = counts["png"]
+        jpg_count = counts["jpg"]
+        webp_count = counts["webp"]
+        picture_webp_count = counts["picture_webp"]
 
         total_webp = webp_count + picture_webp_count
         findings = []
@@ -153,13 +158,9 @@ class PerformanceAnalyzer:
 
         return findings
 
-    def _check_compression(self) -> list[Finding]:
+    def _check_compression(self, home_headers: dict[str, str]) -> list[Finding]:
         # 检查首页的压缩
-        home = self.pages.get(self.base_url)
-        if not home or home.status_code != 200:
-            return []
-
-        encoding = home.headers.get("Content-Encoding", "").lower()
+        encoding = home_headers.get("content-encoding", "").lower()
         if "br" in encoding:
             return [Finding(
                 category=Category.PERFORMANCE, severity=Severity.GOOD,
@@ -181,14 +182,10 @@ class PerformanceAnalyzer:
                 recommendation="启用 Gzip 或 Brotli 压缩，可减少 60-80% 传输大小",
             )]
 
-    def _check_http2(self) -> list[Finding]:
+    def _check_http2(self, home_headers: dict[str, str]) -> list[Finding]:
         # 注意：requests 库默认使用 HTTP/1.1，无法直接检测 HTTP/2
         # 这里通过 alt-svc 头或其他线索判断
-        home = self.pages.get(self.base_url)
-        if not home or home.status_code != 200:
-            return []
-
-        alt_svc = home.headers.get("alt-svc", "")
+        alt_svc = home_headers.get("alt-svc", "")
         if "h2" in alt_svc or "h3" in alt_svc:
             return [Finding(
                 category=Category.PERFORMANCE, severity=Severity.GOOD,
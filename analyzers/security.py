@@ -4,11 +4,37 @@ import re
 from urllib.parse import urlparse
 from models import PageData, Finding, Category, Severity
 
+# 预编译正则，避免每个页面 / 每次调用重复查找 re 内部缓存
+_SERVER_VERSION_RE = re.compile(r'\d+\.\d+')
+# 注释内容（爬虫解析时已去掉 "<!--"）的前缀，等价于在整页中匹配 "<!-- debug" 等
+_DEBUG_COMMENT_PREFIXES = (" debug", " todo", " fixme", " hack")
+
+# 首页需检查的安全响应头：(小写头名, 显示名, 缺失时的说明, 建议)
+_SECURITY_HEADERS = (
+    ("strict-transport-security", "HSTS",
+     "启用 HSTS 强制浏览器使用 HTTPS",
+     "添加 Strict-Transport-Security: max-age=31536000; includeSubDomains"),
+    ("content-security-policy", "CSP（内容安全策略）",
+     "CSP 可防止 XSS 和数据注入攻击",
+     "配置 Content-Security-Policy 头限制资源加载来源"),
+    ("x-frame-options", "X-Frame-Options",
+     "防止页面被嵌入 iframe（点击劫持防护）",
+     "添加 X-Frame-Options: DENY 或 SAMEORIGIN"),
+    ("x-content-type-options", "X-Content-Type-Options",
+     "防止浏览器 MIME 类型嗅探",
+     "添加 X-Content-Type-Options: nosniff"),
+    ("referrer-policy", "Referrer-Policy",
+     "控制请求中的 Referer 信息泄露",
+     "添加 Referrer-Policy: strict-origin-when-cross-origin"),
+)
+
 
 class SecurityAnalyzer:
     def __init__(self, pages: dict[str, PageData], base_url: str):
         self.pages = pages
         self.base_url = base_url
+        # 各项检查只关心 200 页面，构造时筛选一次
+        self.ok_pages = {u: p for u, p in pages.items() if p.status_code == 200}
 
     def analyze(self) -> list[Finding]:
         findings = []
@@ -35,43 +61,27 @@ class SecurityAnalyzer:
         )]
 
     def _check_security_headers(self) -> list[Finding]:
-        home = self.pages.get(self.base_url)
-        if not home or home.status_code != 200:
+        home = self.ok_pages.get(self.base_url)
+        if not home:
             return []
 
         findings = []
-        headers = {k.lower(): v for k, v in home.headers.items()}
-
-        checks = [
-            ("strict-transport-security", "HSTS",
-             "启用 HSTS 强制浏览器使用 HTTPS",
-             "添加 Strict-Transport-Security: max-age=31536000; includeSubDomains"),
-            ("content-security-policy", "CSP（内容安全策略）",
-             "CSP 可防止 XSS 和数据注入攻击",
-             "配置 Content-Security-Policy 头限制资源加载来源"),
-            ("x-frame-options", "X-Frame-Options",
-             "防止页面被嵌入 iframe（点击劫持防护）",
-             "添加 X-Frame-Options: DENY 或 SAMEORIGIN"),
-            ("x-content-type-options", "X-Content-Type-Options",
-             "防止浏览器 MIME 类型嗅探",
-             "添加 X-Content-Type-Options: nosniff"),
-            ("referrer-policy", "Referrer-Policy",
-             "控制请求中的 Referer 信息泄露",
-             "添加 Referrer-Policy: strict-origin-when-cross-origin"),
-        ]
-
-        for header, name, desc_present, recommendation in checks:
-            if header in headers:
+        headers = home.headers_lower
+
+        for header, name, desc_missing, recommendation in _SECURITY_HEADERS:
+            # 一次 get 同时完成存在判断和取值
+            value = headers.get(header)
+            if value is not None:
                 findings.append(Finding(
                     category=Category.SECURITY, severity=Severity.GOOD,
                     title=f"已设置 {name}",
-                    description=f"{name}: {headers[header][:100]}",
+                    description=f"{name}: {value[:100]}",
                 ))
             else:
                 findings.append(Finding(
                     category=Category.SECURITY, severity=Severity.ERROR,
                     title=f"缺少 {name}",
-                    description=desc_present,
+                    description=desc_missing,
                     recommendation=recommendation,
                 ))
 
@@ -82,16 +92,10 @@ class SecurityAnalyzer:
             return []
 
         mixed_pages = []
-        for url, page in self.pages.items():
-            if page.status_code != 200 or not page.html:
-                continue
-            # 检查 HTML 中的 http:// 资源引用
-            http_refs = re.findall(
-                r'(?:src|href|action)\s*=\s*["\']http://[^"\']+["\']',
-                page.html, re.IGNORECASE
-            )
-            if http_refs:
-                mixed_pages.append((url, len(http_refs)))
+        for url, page in self.ok_pages.items():
+            # http:// 资源引用已在爬虫解析 HTML 时提取
+            if page.mixed_http_resources:
+                mixed_pages.append((url, len(page.mixed_http_resources)))
 
         if mixed_pages:
             desc_lines = [f"  - {url} ({count} 处)" for url, count in mixed_pages[:5]]
@@ -109,11 +113,11 @@ class SecurityAnalyzer:
         )]
 
     def _check_cookies(self) -> list[Finding]:
-        home = self.pages.get(self.base_url)
-        if not home or home.status_code != 200:
+        home = self.ok_pages.get(self.base_url)
+        if not home:
             return []
 
-        set_cookie = home.headers.get("Set-Cookie", "")
+        set_cookie = home.headers_lower.get("set-cookie", "")
         if not set_cookie:
             return [Finding(
                 category=Category.SECURITY, severity=Severity.INFO,
@@ -158,18 +162,18 @@ class SecurityAnalyzer:
         return findings
 
     def _check_info_leak(self) -> list[Finding]:
-        home = self.pages.get(self.base_url)
-        if not home or home.status_code != 200:
+        home = self.ok_pages.get(self.base_url)
+        if not home:
             return []
 
         findings = []
-        headers = home.headers
+        headers = home.headers_lower
 
         # Server 头
-        server = headers.get("Server", "")
+        server = headers.get("server", "")
         if server:
             # 检查是否包含版本号
-            if re.search(r'\d+\.\d+', server):
+            if _SERVER_VERSION_RE.search(server):
                 findings.append(Finding(
                     category=Category.SECURITY, severity=Severity.WARNING,
                     title="Server 头暴露版本号",
@@ -184,7 +188,7 @@ class SecurityAnalyzer:
                 ))
 
         # X-Powered-By 头
-        powered_by = headers.get("X-Powered-By", "")
+        powered_by = headers.get("x-powered-by", "")
         if powered_by:
             findings.append(Finding(
                 category=Category.SECURITY, severity=Severity.WARNING,
@@ -193,20 +197,21 @@ class SecurityAnalyzer:
                 recommendation="移除 X-Powered-By 头，避免暴露服务端技术",
             ))
 
-        # 检查 HTML 中的调试信息
-        if home.html:
-            debug_patterns = [
-                (r'(?i)debug\s*[:=]\s*true', "调试模式可能开启"),
-                (r'(?i)APP_DEBUG\s*[:=]\s*true', "Laravel DEBUG 模式开启"),
-                (r'<!-- (?:debug|todo|fixme|hack)', "HTML 注释包含调试信息"),
-            ]
-            for pattern, desc in debug_patterns:
-                if re.search(pattern, home.html):
-                    findings.append(Finding(
-                        category=Category.SECURITY, severity=Severity.ERROR,
-                        title="检测到调试信息",
-                        description=desc,
-                        recommendation="生产环境务必关闭调试模式，清理调试注释",
-                    ))
+        # 检查 HTML 中的调试信息（使用爬虫提取的调试开关和注释列表）
+        debug_hits = []
+        # 调试开关已在爬虫解析时扫描（page.html 默认在解析后释放）
+        if home.debug_flags:
+            debug_hits.append("调试模式可能开启")
+        if "APP_DEBUG" in home.debug_flags:
+            debug_hits.append("Laravel DEBUG 模式开启")
+        if any(c.startswith(_DEBUG_COMMENT_PREFIXES) for c in home.html_comments):
+            debug_hits.append("HTML 注释包含调试信息")
+        for desc in debug_hits:
+            findings.append(Finding(
+                category=Category.SECURITY, severity=Severity.ERROR,
+                title="检测到调试信息",
+                description=desc,
+                recommendation="生产环境务必关闭调试模式，清理调试注释",
+            ))
 
         return findings
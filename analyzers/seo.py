@@ -1,130 +1,163 @@
 """SEO 分析器"""
 
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
 import requests
 from models import PageData, Finding, Category, Severity
 
 
+@dataclass
+class _PageChecks:
+    """单次遍历 pages 得到的逐页检查结果，以及图片 alt 统计"""
+    titles: list[Finding] = field(default_factory=list)
+    meta_descriptions: list[Finding] = field(default_factory=list)
+    h_tags: list[Finding] = field(default_factory=list)
+    canonical: list[Finding] = field(default_factory=list)
+    total_images: int = 0
+    missing_alt: int = 0
+
+
 class SEOAnalyzer:
-    def __init__(self, pages: dict[str, PageData], base_url: str):
+    def __init__(self, pages: dict[str, PageData], base_url: str,
+                 aux: dict[str, requests.Response | None] | None = None):
         self.pages = pages
         self.base_url = base_url
+        # 各项检查只关心 200 页面，构造时筛选一次
+        self.ok_pages = {u: p for u, p in pages.items() if p.status_code == 200}
+        # 爬虫已获取的 robots.txt / sitemap.xml 响应；未提供时分析阶段自行请求
+        self.aux = aux
 
     def analyze(self) -> list[Finding]:
+        checks = self._check_per_page()
         findings = []
-        findings.extend(self._check_titles())
-        findings.extend(self._check_meta_descriptions())
-        findings.extend(self._check_h_tags())
-        findings.extend(self._check_images_alt())
-        findings.extend(self._check_canonical())
+        findings.extend(checks.titles)
+        findings.extend(checks.meta_descriptions)
+        findings.extend(checks.h_tags)
+        findings.extend(self._check_images_alt(checks.total_images, checks.missing_alt))
+        findings.extend(checks.canonical)
         findings.extend(self._check_og_tags())
         findings.extend(self._check_json_ld())
         findings.extend(self._check_robots_sitemap())
         findings.extend(self._check_duplicate_titles())
         return findings
 
-    def _check_titles(self) -> list[Finding]:
-        findings = []
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
-            if not page.title:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.ERROR,
-                    title="缺少 title 标签",
-                    description=f"页面缺少 title 标签",
-                    recommendation="每个页面都应有唯一、描述性的 title（10-60 字符）",
-                    url=url,
-                ))
-            elif len(page.title) < 10:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="title 过短",
-                    description=f"title 只有 {len(page.title)} 字符: '{page.title}'",
-                    recommendation="建议 title 长度在 10-60 字符之间",
-                    url=url,
-                ))
-            elif len(page.title) > 60:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="title 过长",
-                    description=f"title 有 {len(page.title)} 字符，搜索结果中可能被截断",
-                    recommendation="建议 title 长度在 10-60 字符之间",
-                    url=url,
-                ))
-            else:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.GOOD,
-                    title="title 长度合适",
-                    description=f"'{page.title}' ({len(page.title)} 字符)",
-                    url=url,
-                ))
-        return findings
+    def _check_per_page(self) -> _PageChecks:
+        """只遍历一次 pages，完成全部逐页检查并累计图片 alt 统计
 
-    def _check_meta_descriptions(self) -> list[Finding]:
-        findings = []
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
-            if not page.meta_description:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="缺少 meta description",
-                    description="页面没有 meta description",
-                    recommendation="添加 50-160 字符的描述，包含关键词",
-                    url=url,
-                ))
-            elif len(page.meta_description) < 50:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="meta description 过短",
-                    description=f"只有 {len(page.meta_description)} 字符",
-                    recommendation="建议 50-160 字符",
-                    url=url,
-                ))
-            elif len(page.meta_description) > 160:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="meta description 过长",
-                    description=f"{len(page.meta_description)} 字符，搜索结果中会被截断",
-                    recommendation="建议 50-160 字符",
-                    url=url,
-                ))
-        return findings
+        各项结果分别收集，输出顺序与逐项遍历时一致。
+        """
+        checks = _PageChecks()
+        title_append = checks.titles.append
+        meta_append = checks.meta_descriptions.append
+        h_append = checks.h_tags.append
+        canonical_append = checks.canonical.append
 
-    def _check_h_tags(self) -> list[Finding]:
-        findings = []
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
-            if len(page.h1_tags) == 0:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.ERROR,
-                    title="缺少 H1 标签",
-                    description="页面没有 H1 标题",
-                    recommendation="每个页面应有且仅有一个 H1",
-                    url=url,
-                ))
-            elif len(page.h1_tags) > 1:
-                findings.append(Finding(
+        for url, page in self.ok_pages.items():
+            # 长度每页只计算一次；合规的常见情况用一次链式比较直接跳过
+            title_append(self._title_finding(url, page.title, len(page.title)))
+            meta_len = len(page.meta_description)
+            if not 50 <= meta_len <= 160:
+                meta_append(self._meta_description_finding(url, meta_len))
+            if len(page.h1_tags) != 1:
+                h_append(self._h_tags_finding(url, page.h1_tags))
+            if not page.canonical_url:
+                canonical_append(Finding(
                     category=Category.SEO, severity=Severity.WARNING,
-                    title="多个 H1 标签",
-                    description=f"页面有 {len(page.h1_tags)} 个 H1: {page.h1_tags}",
-                    recommendation="每个页面只保留一个 H1",
+                    title="缺少 canonical URL",
+                    description="页面没有设置 canonical URL",
+                    recommendation="设置 canonical URL 避免重复内容问题",
                     url=url,
                 ))
-        return findings
-
-    def _check_images_alt(self) -> list[Finding]:
-        total_images = 0
-        missing_alt = 0
-        for page in self.pages.values():
-            if page.status_code != 200:
-                continue
+            # 图片 alt
+            checks.total_images += len(page.images)
             for img in page.images:
-                total_images += 1
                 if not img.get("alt", "").strip():
-                    missing_alt += 1
+                    checks.missing_alt += 1
+
+        return checks
+
+    @staticmethod
+    def _title_finding(url: str, title: str, length: int) -> Finding:
+        if 10 <= length <= 60:
+            return Finding(
+                category=Category.SEO, severity=Severity.GOOD,
+                title="title 长度合适",
+                description=f"'{title}' ({length} 字符)",
+                url=url,
+            )
+        elif length == 0:
+            return Finding(
+                category=Category.SEO, severity=Severity.ERROR,
+                title="缺少 title 标签",
+                description=f"页面缺少 title 标签",
+                recommendation="每个页面都应有唯一、描述性的 title（10-60 字符）",
+                url=url,
+            )
+        elif length < 10:
+            return Finding(
+                category=Category.SEO, severity=Severity.WARNING,
+                title="title 过短",
+                description=f"title 只有 {length} 字符: '{title}'",
+                recommendation="建议 title 长度在 10-60 字符之间",
+                url=url,
+            )
+        return Finding(
+            category=Category.SEO, severity=Severity.WARNING,
+            title="title 过长",
+            description=f"title 有 {length} 字符，搜索结果中可能被截断",
+            recommendation="建议 title 长度在 10-60 字符之间",
+            url=url,
+        )
 
+    @staticmethod
+    def _meta_description_finding(url: str, length: int) -> Finding:
+        """长度不在 50-160 之间的 meta description"""
+        if length == 0:
+            return Finding(
+                category=Category.SEO, severity=Severity.WARNING,
+                title="缺少 meta description",
+                description="页面没有 meta description",
+                recommendation="添加 50-160 字符的描述，包含关键词",
+                url=url,
+            )
+        elif length < 50:
+            return Finding(
+                category=Category.SEO, severity=Severity.WARNING,
+                title="meta description 过短",
+                description=f"只有 {length} 字符",
+                recommendation="建议 50-160 字符",
+                url=url,
+            )
+        return Finding(
+            category=Category.SEO, severity=Severity.WARNING,
+            title="meta description 过长",
+            description=f"{length} 字符，搜索结果中会被截断",
+            recommendation="建议 50-160 字符",
+            url=url,
+        )
+
+    @staticmethod
+    def _h_tags_finding(url: str, h1_tags: Sequence[str]) -> Finding:
+        """H1 个数不为 1 的页面"""
+        if not h1_tags:
+            return Finding(
+                category=Category.SEO, severity=Severity.ERROR,
+                title="缺少 H1 标签",
+                description="页面没有 H1 标题",
+                recommendation="每个页面应有且仅有一个 H1",
+                url=url,
+            )
+        return Finding(
+            category=Category.SEO, severity=Severity.WARNING,
+            title="多个 H1 标签",
+            description=f"页面有 {len(h1_tags)} 个 H1: {list(h1_tags)}",
+            recommendation="每个页面只保留一个 H1",
+            url=url,
+        )
+
+    def _check_images_alt(self, total_images: int, missing_alt: int) -> list[Finding]:
         if total_images == 0:
             return []
 
@@ -143,26 +176,11 @@ class SEOAnalyzer:
             description=f"所有 {total_images} 张图片都有 alt 属性",
         )]
 
-    def _check_canonical(self) -> list[Finding]:
-        findings = []
-        for url, page in self.pages.items():
-            if page.status_code != 200:
-                continue
-            if not page.canonical_url:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="缺少 canonical URL",
-                    description="页面没有设置 canonical URL",
-                    recommendation="设置 canonical URL 避免重复内容问题",
-                    url=url,
-                ))
-        return findings
-
     def _check_og_tags(self) -> list[Finding]:
         findings = []
         # 只检查首页的 OG 标签
-        home = self.pages.get(self.base_url)
-        if not home or home.status_code != 200:
+        home = self.ok_pages.get(self.base_url)
+        if not home:
             return findings
 
         required_og = ["og:title", "og:description", "og:image", "og:url"]
@@ -185,7 +203,7 @@ class SEOAnalyzer:
         return findings
 
     def _check_json_ld(self) -> list[Finding]:
-        has_json_ld = any(page.json_ld for page in self.pages.values() if page.status_code == 200)
+        has_json_ld = any(page.json_ld for page in self.ok_pages.values())
         if has_json_ld:
             return [Finding(
                 category=Category.SEO, severity=Severity.GOOD,
@@ -199,72 +217,78 @@ class SEOAnalyzer:
             recommendation="添加 Article/Product/Organization 等 JSON-LD 标记",
         )]
 
-    def _check_robots_sitemap(self) -> list[Finding]:
-        findings = []
-        # 检查 robots.txt
+    def _get_aux(self, name: str, path: str) -> requests.Response | None:
+        """取站点级资源响应，优先复用爬虫结果；获取失败返回 None"""
+        if self.aux is not None:
+            return self.aux.get(name)
         try:
-            resp = requests.get(f"{self.base_url}/robots.txt", timeout=10,
+            return requests.get(f"{self.base_url}{path}", timeout=10,
                                 headers={"User-Agent": "TaoTaoHuFa/1.0"})
-            if resp.status_code == 200:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.GOOD,
-                    title="robots.txt 存在",
-                    description="网站有 robots.txt 文件",
-                ))
-            else:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.WARNING,
-                    title="robots.txt 缺失",
-                    description=f"robots.txt 返回 {resp.status_code}",
-                    recommendation="创建 robots.txt 文件指导搜索引擎爬取",
-                ))
         except Exception:
+            return None
+
+    def _check_robots_sitemap(self) -> list[Finding]:
+        findings = []
+        # 检查 robots.txt
+        resp = self._get_aux("robots", "/robots.txt")
+        if resp is None:
             findings.append(Finding(
                 category=Category.SEO, severity=Severity.WARNING,
                 title="robots.txt 不可访问",
                 description="无法获取 robots.txt",
             ))
+        elif resp.status_code == 200:
+            findings.append(Finding(
+                category=Category.SEO, severity=Severity.GOOD,
+                title="robots.txt 存在",
+                description="网站有 robots.txt 文件",
+            ))
+        else:
+            findings.append(Finding(
+                category=Category.SEO, severity=Severity.WARNING,
+                title="robots.txt 缺失",
+                description=f"robots.txt 返回 {resp.status_code}",
+                recommendation="创建 robots.txt 文件指导搜索引擎爬取",
+            ))
 
         # 检查 sitemap.xml
-        try:
-            resp = requests.get(f"{self.base_url}/sitemap.xml", timeout=10,
-                                headers={"User-Agent": "TaoTaoHuFa/1.0"})
-            if resp.status_code == 200:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.GOOD,
-                    title="sitemap.xml 存在",
-                    description="网站有 sitemap.xml",
-                ))
-            else:
-                findings.append(Finding(
-                    category=Category.SEO, severity=Severity.ERROR,
-                    title="sitemap.xml 缺失",
-                    description=f"sitemap.xml 返回 {resp.status_code}",
-                    recommendation="创建 sitemap.xml 帮助搜索引擎发现所有页面",
-                ))
-        except Exception:
+        resp = self._get_aux("sitemap", "/sitemap.xml")
+        if resp is None:
             findings.append(Finding(
                 category=Category.SEO, severity=Severity.ERROR,
                 title="sitemap.xml 不可访问",
                 description="无法获取 sitemap.xml",
                 recommendation="创建并提交 sitemap.xml",
             ))
+        elif resp.status_code == 200:
+            findings.append(Finding(
+                category=Category.SEO, severity=Severity.GOOD,
+                title="sitemap.xml 存在",
+                description="网站有 sitemap.xml",
+            ))
+        else:
+            findings.append(Finding(
+                category=Category.SEO, severity=Severity.ERROR,
+                title="sitemap.xml 缺失",
+                description=f"sitemap.xml 返回 {resp.status_code}",
+                recommendation="创建 sitemap.xml 帮助搜索引擎发现所有页面",
+            ))
 
         return findings
 
     def _check_duplicate_titles(self) -> list[Finding]:
-        title_pages: dict[str, list[str]] = {}
-        for url, page in self.pages.items():
-            if page.status_code == 200 and page.title:
-                title_pages.setdefault(page.title, []).append(url)
+        # 只需要每个标题的出现次数，Counter 不为只出现一次的标题分配 URL 列表
+        title_counts = Counter(
+            page.title for page in self.ok_pages.values() if page.title
+        )
 
         findings = []
-        for title, urls in title_pages.items():
-            if len(urls) > 1:
+        for title, count in title_counts.items():
+            if count > 1:
                 findings.append(Finding(
                     category=Category.SEO, severity=Severity.ERROR,
                     title="重复标题",
-                    description=f"'{title}' 在 {len(urls)} 个页面中重复使用",
+                    description=f"'{title}' 在 {count} 个页面中重复使用",
                     recommendation="每个页面使用唯一的 title",
                 ))
         return findings
@@ -1,25 +1,276 @@
 """爬虫核心：BFS 爬取、链接发现、速率控制"""
 
+import functools
+import json
+import multiprocessing
+import sys
+import threading
 import time
 import re
 from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
 from urllib.robotparser import RobotFileParser
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from requests.compat import chardet
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, CData, Comment, NavigableString, Tag
 
 from models import PageData
-from utils import normalize_url, is_same_domain, is_crawlable_url
+from utils import normalize_url, is_same_domain, is_crawlable_url, json_loads
+
+try:
+    import lxml  # noqa: F401  仅用于探测，实际由 BeautifulSoup 调用
+
+    # C 实现的 lxml 解析器比纯 Python 的 html.parser 快数倍
+    _HTML_PARSER = "lxml"
+except ImportError:  # lxml 为可选依赖
+    _HTML_PARSER = "html.parser"
+
+# 删去非中文字符后剩余长度即中文字数，只产生一个字符串而非逐字列表
+_NON_CJK_RE = re.compile(r'[^\u4e00-\u9fff]+')
+_WORD_RE = re.compile(r'[a-zA-Z]+')
+# 不计入正文字数的标签（整棵子树跳过）
+_NON_TEXT_TAGS = frozenset(("script", "style", "nav", "header", "footer"))
+# 计入正文的字符串类型，与 get_text() 默认一致（不含注释、<template> 内文本等）
+_TEXT_STRING_TYPES = (NavigableString, CData)
+# 调试开关：以字面量 "debug" 开头的单一模式可走 re 的前缀快速查找，整页只扫描一遍。
+# APP_DEBUG=true 必然包含 debug=true，是否为 APP_DEBUG 由匹配位置前 4 个字符判断
+_DEBUG_FLAG_RE = re.compile(r'(?i)debug\s*[:=]\s*true')
+# 超过该大小的 HTML 不下载正文（按 Content-Length 判断）
+_MAX_HTML_BYTES = 10 * 1024 * 1024
+# 流式读取正文的块大小；未声明长度（chunked 等）时读满 _MAX_HTML_BYTES 即停止
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+# 以这些前缀开头的 href 解析结果与页面路径无关，只取决于页面的 scheme://netloc
+_ORIGIN_RELATIVE_PREFIXES = ("/", "http://", "https://")
+
+
+@functools.lru_cache(maxsize=8192)
+def _resolve_link(href: str, page_url: str, base_url: str) -> tuple[str, bool]:
+    """href -> (标准化后的绝对 URL, 是否站内链接)
+
+    page_url 只需能确定解析结果：绝对和根相对 href 传页面 origin，
+    导航、页脚等跨页重复的链接因此在不同页面间也能命中缓存；
+    intern 后所有页面共享同一 URL 字符串。
+    """
+    full_url = sys.intern(normalize_url(href, page_url))
+    return full_url, is_same_domain(full_url, base_url)
+
+
+def _page_origin(url: str) -> str:
+    """页面 URL 的 scheme://netloc"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _node_after_subtree(tag: Tag):
+    """文档顺序中紧跟 tag 整棵子树之后的节点，不存在时返回 None"""
+    node = tag
+    while node is not None and node.next_sibling is None:
+        node = node.parent
+    return node.next_sibling if node is not None else None
+
+
+def _scan_debug_flags(html: str) -> list[str]:
+    """扫描 HTML 中的调试开关，返回出现的开关名（"debug" / "APP_DEBUG"）"""
+    flags = []
+    for m in _DEBUG_FLAG_RE.finditer(html):
+        if not flags:
+            flags.append("debug")
+        start = m.start()
+        if html[max(0, start - 4):start].upper() == "APP_":
+            flags.append("APP_DEBUG")
+            break
+    return flags
+
+
+def _decode_body(body: bytes, encoding: str | None) -> str:
+    """按响应编码解码正文，与 requests 的 Response.text 一致
+
+    正文已通过 iter_content 读出，无法再访问 resp.apparent_encoding，未声明编码时在此探测。
+    """
+    if not body:
+        return ""
+    if encoding is None:
+        encoding = chardet.detect(body)["encoding"] if chardet is not None else "utf-8"
+    try:
+        return str(body, encoding or "utf-8", errors="replace")
+    except (LookupError, TypeError):
+        return str(body, errors="replace")
+
+
+def _parse_content_length(value: str | None) -> int:
+    """解析 Content-Length 头，缺失或非法时返回 0"""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _parse_html(page: PageData, base_url: str, is_home: bool = False):
+    """解析 page.html，把提取的结构化数据写回 page
+
+    调试开关和 HTML 注释只有首页会被检查，is_home 为 False 时不扫描整页 HTML、不保存注释。
+    """
+    soup = BeautifulSoup(page.html, _HTML_PARSER)
+
+    # 只遍历一次 DOM，按标签名分派提取，代替逐类 find_all 的多次整树遍历
+    title_tag = meta_desc_tag = canonical_tag = None
+    page_origin = _page_origin(page.url)
+    # 正文文本在同一次遍历中收集；进入 script/nav 等标签后跳过其子树文本直到 skip_end
+    text_parts = []
+    text_append = text_parts.append
+    skipping = False
+    skip_end = None
+    for node in soup.descendants:
+        if skipping and node is skip_end:
+            skipping = False
+        if not isinstance(node, Tag):
+            node_type = type(node)
+            if node_type is Comment:
+                if is_home:
+                    page.html_comments.append(str(node))
+            elif not skipping and node_type in _TEXT_STRING_TYPES:
+                text_append(node)
+            continue
+        tag = node
+
+        # 混合内容：src/href/action 直接引用 http:// 资源
+        for attr in ("src", "href", "action"):
+            value = tag.get(attr)
+            if value and value[:7].lower() == "http://":
+                page.mixed_http_resources.append(value)
+
+        name = tag.name
+        if not skipping and name in _NON_TEXT_TAGS:
+            skipping = True
+            skip_end = _node_after_subtree(tag)
+
+        if name in ("h1", "h2", "h3"):
+            # H 标签
+            text = tag.get_text(strip=True)
+            if name == "h1":
+                page.h1_tags.append(text)
+            elif name == "h2":
+                page.h2_tags.append(text)
+            else:
+                page.h3_tags.append(text)
+        elif name == "a":
+            # 链接
+            href = tag.get("href")
+            if href is None or href.startswith(("mailto:", "tel:", "javascript:", "#")):
+                continue
+            link_base = page_origin if href.startswith(_ORIGIN_RELATIVE_PREFIXES) else page.url
+            full_url, internal = _resolve_link(href, link_base, base_url)
+            if internal:
+                page.internal_links.append(full_url)
+            else:
+                page.external_links.append(full_url)
+        elif name == "img":
+            # 图片（识别 <picture> + <source type="image/webp"> 的标准写法）
+            has_webp_source = False
+            # lxml 不把 <source> 当作空元素，<img> 会被嵌进 <source>，
+            # 因此向上查找最近的 <picture> 而不是只看直接父节点
+            picture = tag.find_parent("picture")
+            if picture:
+                for source in picture.find_all("source"):
+                    stype = (source.get("type") or "").lower()
+                    srcset = (source.get("srcset") or "").lower()
+                    if "webp" in stype or srcset.endswith(".webp"):
+                        has_webp_source = True
+                        break
+            page.images.append({
+                "src": tag.get("src", ""),
+                "alt": tag.get("alt", ""),
+                "has_webp_source": has_webp_source,
+            })
+        elif name == "script":
+            # 资源统计
+            if tag.get("src") is not None:
+                page.scripts.append(tag.get("src", ""))
+            # JSON-LD
+            # 空脚本直接跳过，不走解析失败的异常路径
+            if tag.get("type") == "application/ld+json" and tag.string:
+                try:
+                    # orjson 只接受精确的 str 类型，NavigableString 需先转换
+                    data = json_loads(str(tag.string))
+                    if isinstance(data, list):
+                        page.json_ld.extend(data)
+                    else:
+                        page.json_ld.append(data)
+                except (json.JSONDecodeError, TypeError):
+                    pass
+        elif name == "link":
+            rel = tag.get("rel") or []
+            if "stylesheet" in rel:
+                page.stylesheets.append(tag.get("href", ""))
+            # canonical（取第一个）
+            if "canonical" in rel and canonical_tag is None:
+                canonical_tag = tag
+        elif name == "meta":
+            # meta description（取第一个）
+            if tag.get("name") == "description" and meta_desc_tag is None:
+                meta_desc_tag = tag
+            # Open Graph
+            prop = tag.get("property")
+            if prop is not None and prop.startswith("og:"):
+                page.og_tags[prop] = tag.get("content", "")
+        elif name == "title" and title_tag is None:
+            title_tag = tag
+
+    page.title = title_tag.get_text(strip=True) if title_tag else ""
+    if meta_desc_tag:
+        page.meta_description = meta_desc_tag.get("content", "")
+    if canonical_tag:
+        page.canonical_url = canonical_tag.get("href", "")
+
+    if is_home:
+        page.debug_flags = _scan_debug_flags(page.html)
+
+    # 字数（纯文本内容）：空白既不是中文也不是字母，无需逐段 strip
+    text = " ".join(text_parts)
+    # 中文按字符算，英文按单词算
+    chinese_chars = len(_NON_CJK_RE.sub("", text))
+    # subn 只返回替换次数，不构造单词列表
+    english_words = _WORD_RE.subn("", text)[1]
+    page.word_count = chinese_chars + english_words
+
+
+# 解析结果字段：进程池解析时只回传这些字段，合并回主进程中的 PageData
+_PARSED_FIELDS = (
+    "title", "meta_description", "h1_tags", "h2_tags", "h3_tags", "images",
+    "internal_links", "external_links", "scripts", "stylesheets", "canonical_url",
+    "og_tags", "json_ld", "word_count", "mixed_http_resources", "html_comments",
+    "debug_flags",
+)
+
+
+def _parse_html_worker(html: str, url: str, base_url: str, is_home: bool = False) -> dict:
+    """进程池入口：解析 HTML 并返回可 pickle 的字段字典"""
+    page = PageData(url=url, html=html)
+    _parse_html(page, base_url, is_home)
+    return {name: getattr(page, name) for name in _PARSED_FIELDS}
 
 
 class Crawler:
     USER_AGENT = "TaoTaoHuFa/1.0"
 
-    def __init__(self, base_url: str, max_pages: int = 50, delay: float = 1.0):
+    def __init__(self, base_url: str, max_pages: int = 50, delay: float = 1.0,
+                 concurrency: int = 4, keep_html: bool = False, parse_workers: int = 0):
         self.base_url = base_url.rstrip("/")
         self.max_pages = max_pages
         self.delay = delay
+        self.concurrency = max(1, concurrency)
+        # 分析所需数据都在解析时提取，默认解析后释放 page.html 以减少内存占用
+        self.keep_html = keep_html
+        # 解析进程数，0 表示在抓取线程内直接解析（页面少时省去进程启动和 pickle 开销）
+        self.parse_workers = max(0, parse_workers)
+        self._parse_pool: ProcessPoolExecutor | None = None
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": self.USER_AGENT,
@@ -27,20 +278,50 @@ class Crawler:
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
             "Accept-Encoding": "gzip, deflate, br",
         })
+        # 连接池至少容纳全部并发请求，否则超出的连接用完即被丢弃，无法 keep-alive 复用
+        # 连接/读取失败时退避重试；不按状态码重试，4xx/5xx 照常记录为页面状态。
+        # status=0 且忽略 Retry-After：否则 413/429/503 会按 Retry-After 无上限地休眠重试
+        adapter = HTTPAdapter(
+            pool_maxsize=max(self.concurrency, DEFAULT_POOLSIZE),
+            max_retries=Retry(total=3, backoff_factor=0.5, status=0,
+                              respect_retry_after_header=False),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.visited: set[str] = set()
         self.pages: dict[str, PageData] = {}
+        # 按 host 限速：记录每个 host 下一次允许发起请求的时间
+        self._host_next_fetch: dict[str, float] = {}
+        self._throttle_lock = threading.Lock()
+        # 站点级辅助资源的响应（获取失败为 None），供 SEOAnalyzer 直接复用
+        self.aux: dict[str, requests.Response | None] = {"robots": None, "sitemap": None}
+        # robots.txt 经由 self.session 获取，同时完成 DNS 解析和 TCP/TLS 握手，
+        # 首个页面请求直接复用这条 keep-alive 连接
         self.robots_parser = self._load_robots()
 
-    def _load_robots(self) -> RobotFileParser:
-        """加载 robots.txt"""
-        rp = RobotFileParser()
-        robots_url = f"{self.base_url}/robots.txt"
+    def _fetch_aux(self, path: str) -> requests.Response | None:
+        """通过爬虫 session 获取站点级资源，复用连接池和请求头"""
         try:
-            rp.set_url(robots_url)
-            rp.read()
-            print(f"  ✓ robots.txt 已加载")
-        except Exception:
+            return self.session.get(f"{self.base_url}{path}", timeout=10)
+        except requests.RequestException:
+            return None
+
+    def _load_robots(self) -> RobotFileParser:
+        """加载 robots.txt（401/403/5xx 视为全部禁止，其余 4xx 视为全部允许）"""
+        rp = RobotFileParser(f"{self.base_url}/robots.txt")
+        resp = self.aux["robots"] = self._fetch_aux("/robots.txt")
+        if resp is None:
+            rp.allow_all = True
             print(f"  ✗ robots.txt 加载失败，将爬取所有页面")
+        elif resp.status_code in (401, 403) or resp.status_code >= 500:
+            rp.disallow_all = True
+            print(f"  ✓ robots.txt 已加载")
+        elif 400 <= resp.status_code < 500:
+            rp.allow_all = True
+            print(f"  ✓ robots.txt 已加载")
+        else:
+            rp.parse(resp.text.splitlines())
+            print(f"  ✓ robots.txt 已加载")
         return rp
 
     def _can_fetch(self, url: str) -> bool:
@@ -50,148 +331,133 @@ class Crawler:
         except Exception:
             return True
 
+    def _throttle(self, url: str):
+        """同一 host 的请求发起间隔不小于 self.delay（并发请求依次领取时间片）"""
+        host = urlparse(url).netloc
+        with self._throttle_lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_fetch.get(host, now))
+            self._host_next_fetch[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
     def _fetch_page(self, url: str) -> PageData:
-        """抓取单个页面"""
+        """抓取单个页面（在工作线程中执行）"""
         page = PageData(url=url)
+        self._throttle(url)
         try:
             start = time.time()
-            resp = self.session.get(url, timeout=15, allow_redirects=True)
-            page.response_time = time.time() - start
-            page.status_code = resp.status_code
-            page.content_type = resp.headers.get("Content-Type", "")
-            page.headers = dict(resp.headers)
-            page.content_length = len(resp.content)
-
-            if "text/html" not in page.content_type:
-                return page
-
-            page.html = resp.text
-            self._parse_html(page)
+            # stream=True：先看响应头，非 HTML 或声明过大的响应不下载正文
+            with self.session.get(url, timeout=15, allow_redirects=True, stream=True) as resp:
+                page.status_code = resp.status_code
+                page.content_type = resp.headers.get("Content-Type", "")
+                page.headers = dict(resp.headers)
+                page.headers_lower = {k.lower(): v for k, v in resp.headers.items()}
+                declared_length = _parse_content_length(page.headers_lower.get("content-length"))
+
+                if "text/html" not in page.content_type or declared_length > _MAX_HTML_BYTES:
+                    page.response_time = time.time() - start
+                    page.content_length = declared_length
+                    return page
+
+                # 未声明长度时边读边计数，超过上限立即停止下载，不再解码和解析
+                body = bytearray()
+                for chunk in resp.iter_content(chunk_size=_READ_CHUNK_BYTES):
+                    body += chunk
+                    if len(body) > _MAX_HTML_BYTES:
+                        break
+                page.response_time = time.time() - start
+                page.content_length = len(body)
+                if len(body) > _MAX_HTML_BYTES:
+                    return page
+                page.html = _decode_body(body, resp.encoding)
+            self._parse(page)
+            if not self.keep_html:
+                page.html = ""
 
         except requests.RequestException as e:
             page.error = str(e)
             page.status_code = 0
+        finally:
+            # 所有返回路径（含未解析的非 HTML / 出错页面）统一把列表字段转为 tuple，分析阶段只读
+            page.freeze()
 
         return page
 
-    def _parse_html(self, page: PageData):
-        """解析 HTML，提取结构化数据"""
-        soup = BeautifulSoup(page.html, "html.parser")
-
-        # title
-        title_tag = soup.find("title")
-        page.title = title_tag.get_text(strip=True) if title_tag else ""
-
-        # meta description
-        meta_desc = soup.find("meta", attrs={"name": "description"})
-        if meta_desc:
-            page.meta_description = meta_desc.get("content", "")
-
-        # H 标签
-        page.h1_tags = [h.get_text(strip=True) for h in soup.find_all("h1")]
-        page.h2_tags = [h.get_text(strip=True) for h in soup.find_all("h2")]
-        page.h3_tags = [h.get_text(strip=True) for h in soup.find_all("h3")]
-
-        # 图片（识别 <picture> + <source type="image/webp"> 的标准写法）
-        for img in soup.find_all("img"):
-            has_webp_source = False
-            parent = img.parent
-            if parent and parent.name == "picture":
-                for source in parent.find_all("source"):
-                    stype = (source.get("type") or "").lower()
-                    srcset = (source.get("srcset") or "").lower()
-                    if "webp" in stype or srcset.endswith(".webp"):
-                        has_webp_source = True
-                        break
-            page.images.append({
-                "src": img.get("src", ""),
-                "alt": img.get("alt", ""),
-                "has_webp_source": has_webp_source,
-            })
-
-        # 链接
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            if href.startswith(("mailto:", "tel:", "javascript:", "#")):
-                continue
-            full_url = normalize_url(href, page.url)
-            if is_same_domain(full_url, self.base_url):
-                page.internal_links.append(full_url)
-            else:
-                page.external_links.append(full_url)
-
-        # canonical
-        canonical = soup.find("link", rel="canonical")
-        if canonical:
-            page.canonical_url = canonical.get("href", "")
-
-        # Open Graph
-        for og in soup.find_all("meta", property=re.compile(r"^og:")):
-            page.og_tags[og["property"]] = og.get("content", "")
-
-        # JSON-LD
-        for script in soup.find_all("script", type="application/ld+json"):
-            try:
-                import json
-                data = json.loads(script.string or "")
-                if isinstance(data, list):
-                    page.json_ld.extend(data)
-                else:
-                    page.json_ld.append(data)
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-        # 资源统计
-        page.scripts = [s.get("src", "") for s in soup.find_all("script", src=True)]
-        page.stylesheets = [
-            l.get("href", "") for l in soup.find_all("link", rel="stylesheet")
-        ]
-
-        # 字数（纯文本内容）
-        for tag in soup(["script", "style", "nav", "header", "footer"]):
-            tag.decompose()
-        text = soup.get_text(separator=" ", strip=True)
-        # 中文按字符算，英文按单词算
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-        english_words = len(re.findall(r'[a-zA-Z]+', text))
-        page.word_count = chinese_chars + english_words
+    def _parse(self, page: PageData):
+        """解析页面：配置了解析进程池时交给子进程，绕开 GIL 并行解析"""
+        is_home = page.url == self.base_url
+        if self._parse_pool is None:
+            _parse_html(page, self.base_url, is_home)
+            return
+        fields = self._parse_pool.submit(
+            _parse_html_worker, page.html, page.url, self.base_url, is_home).result()
+        for name, value in fields.items():
+            setattr(page, name, value)
 
     def crawl(self) -> dict[str, PageData]:
-        """BFS 广度优先爬取"""
+        """BFS 广度优先爬取
+
+        滑动窗口：始终保持至多 concurrency 个请求在途，队首页面完成即处理并补充新请求，
+        不必等整批完成。结果按出队顺序处理，因此页面顺序和 max_pages 截断结果与串行爬取一致。
+        """
         print(f"\n🕷️ 桃桃护法 - 开始爬取 {self.base_url}")
-        print(f"  最大页面数: {self.max_pages}, 请求间隔: {self.delay}s\n")
+        print(f"  最大页面数: {self.max_pages}, 请求间隔: {self.delay}s, 并发数: {self.concurrency}"
+              + (f", 解析进程数: {self.parse_workers}" if self.parse_workers else "") + "\n")
 
         queue = deque([self.base_url])
         self.visited.add(self.base_url)
+        in_flight: deque = deque()  # (url, future)，按出队顺序排列
+
+        # 子进程在首次 submit 时由抓取线程创建，此时其他线程可能持有锁；
+        # 用 spawn 启动全新解释器，不 fork 多线程进程（Linux 默认的 fork 不安全）
+        parse_pool = ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) if self.parse_workers else None
+        # 多一个线程给 sitemap.xml，不占用页面抓取的并发名额
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency + 1) as pool, (parse_pool or nullcontext()):
+                self._parse_pool = parse_pool
+                # sitemap.xml 与页面抓取重叠进行，分析阶段不再发起网络请求
+                sitemap_future = pool.submit(self._fetch_aux, "/sitemap.xml")
+                while True:
+                    # 补满窗口：不超过并发数，也不超过剩余页面配额
+                    while (queue and len(in_flight) < self.concurrency
+                           and len(self.pages) + len(in_flight) < self.max_pages):
+                        url = queue.popleft()
+                        if not self._can_fetch(url):
+                            print(f"  [跳过] robots.txt 禁止: {url}")
+                            continue
+                        in_flight.append((url, pool.submit(self._fetch_page, url)))
+                    if not in_flight:
+                        break
 
-        while queue and len(self.pages) < self.max_pages:
-            url = queue.popleft()
-
-            if not self._can_fetch(url):
-                print(f"  [跳过] robots.txt 禁止: {url}")
-                continue
-
-            print(f"  [{len(self.pages) + 1}/{self.max_pages}] {url}", end=" ")
-            page = self._fetch_page(url)
-            self.pages[url] = page
-
-            if page.error:
-                print(f"❌ 错误: {page.error}")
-            elif page.status_code != 200:
-                print(f"⚠️ {page.status_code}")
-            else:
-                print(f"✅ {page.response_time:.1f}s {page.word_count}字")
-
-            # 发现新链接加入队列
-            for link in page.internal_links:
-                if (link not in self.visited
-                        and is_crawlable_url(link)
-                        and len(self.visited) < self.max_pages * 2):
-                    self.visited.add(link)
-                    queue.append(link)
-
-            if queue and len(self.pages) < self.max_pages:
-                time.sleep(self.delay)
+                    url, future = in_flight.popleft()
+                    page = future.result()
+                    self.pages[url] = page
+
+                    if page.error:
+                        status = f"❌ 错误: {page.error}"
+                    elif page.status_code != 200:
+                        status = f"⚠️ {page.status_code}"
+                    else:
+                        status = f"✅ {page.response_time:.1f}s {page.word_count}字"
+                    print(f"  [{len(self.pages)}/{self.max_pages}] {url} {status}")
+
+                    # 发现新链接加入队列
+                    for link in page.internal_links:
+                        if (link not in self.visited
+                                and is_crawlable_url(link)
+                                and len(self.visited) < self.max_pages * 2):
+                            self.visited.add(link)
+                            queue.append(link)
+
+                self.aux["sitemap"] = sitemap_future.result()
+        finally:
+            self._parse_pool = None
+            # 页面和 robots.txt / sitemap.xml 的响应都已读取完毕，释放连接池
+            self.session.close()
 
         print(f"\n✅ 爬取完成，共 {len(self.pages)} 个页面\n")
         return self.pages
@@ -4,7 +4,9 @@ import argparse
 import os
 import sys
 import time
-from datetime import datetime
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import urlparse
 
 from crawler import Crawler
@@ -13,17 +15,29 @@ from models import AnalysisReport, CategoryReport, Category
 from report import generate_report
 from utils import calculate_score, score_to_grade, now_str
 
+# 默认报告目录：脚本所在目录下的 reports/
+_REPORTS_DIR = Path(__file__).resolve().parent / "reports"
+
+
+@lru_cache(maxsize=None)
+def _load_dataforseo():
+    """按需导入 DataForSEO 模块（只在配置了凭据时调用），多次 run_analysis 共用导入结果"""
+    from analyzers.dataforseo import DataForSEOClient, DataForSEOAnalyzer
+    return DataForSEOClient, DataForSEOAnalyzer
+
 
 def run_analysis(url: str, max_pages: int = 50, delay: float = 1.0,
                  output: str = "report.html",
-                 dataforseo_login: str = "", dataforseo_password: str = ""):
+                 dataforseo_login: str = "", dataforseo_password: str = "",
+                 dataforseo_cache: str = "", concurrency: int = 4, parse_workers: int = 0):
     """执行完整分析流程"""
     print("🍑 桃桃护法 v1.0 — tenmomo.com 的守护工具")
     print("=" * 50)
 
     # 1. 爬取
     start_time = time.time()
-    crawler = Crawler(url, max_pages=max_pages, delay=delay)
+    crawler = Crawler(url, max_pages=max_pages, delay=delay, concurrency=concurrency,
+                      parse_workers=parse_workers)
     pages = crawler.crawl()
 
     if not pages:
@@ -34,11 +48,14 @@ def run_analysis(url: str, max_pages: int = 50, delay: float = 1.0,
 
     # 2. 四维分析
     print("🔍 开始分析...")
+    # 分析器共用爬虫规范化后的站点 URL（已去掉尾部斜杠），与 pages 的键一致，
+    # 传入 "https://example.com/" 时首页查找也能命中
+    base_url = crawler.base_url
     analyzers = [
-        (Category.SEO, SEOAnalyzer(pages, url)),
-        (Category.PERFORMANCE, PerformanceAnalyzer(pages, url)),
-        (Category.CONTENT, ContentAnalyzer(pages, url)),
-        (Category.SECURITY, SecurityAnalyzer(pages, url)),
+        (Category.SEO, SEOAnalyzer(pages, base_url, crawler.aux)),
+        (Category.PERFORMANCE, PerformanceAnalyzer(pages, base_url)),
+        (Category.CONTENT, ContentAnalyzer(pages, base_url)),
+        (Category.SECURITY, SecurityAnalyzer(pages, base_url)),
     ]
 
     # DataForSEO 增强分析（可选）
@@ -46,8 +63,9 @@ def run_analysis(url: str, max_pages: int = 50, delay: float = 1.0,
     if dataforseo_login and dataforseo_password:
         print("\n📡 DataForSEO API 增强分析...")
         try:
-            from analyzers.dataforseo import DataForSEOClient, DataForSEOAnalyzer
-            client = DataForSEOClient(dataforseo_login, dataforseo_password)
+            DataForSEOClient, DataForSEOAnalyzer = _load_dataforseo()
+            client = DataForSEOClient(dataforseo_login, dataforseo_password,
+                                      cache_dir=dataforseo_cache)
             dfs_analyzer = DataForSEOAnalyzer(client, url)
             dataforseo_findings = dfs_analyzer.analyze()
             print(f"  获得 {len(dataforseo_findings)} 条专业分析结果")
@@ -59,20 +77,26 @@ def run_analysis(url: str, max_pages: int = 50, delay: float = 1.0,
         print("   或设置环境变量 DATAFORSEO_LOGIN / DATAFORSEO_PASSWORD")
         print("   文档: https://docs.dataforseo.com/v3/\n")
 
+    # DataForSEO 发现先按类别分桶，循环内直接合并，不必每个类别都扫描一遍
+    dataforseo_by_category = defaultdict(list)
+    for df in dataforseo_findings:
+        dataforseo_by_category[df.category].append(df)
+
     categories = []
     for category, analyzer in analyzers:
         findings = analyzer.analyze()
         # 合并 DataForSEO 同类别的发现
-        for df in dataforseo_findings:
-            if df.category == category:
-                findings.append(df)
-        score = calculate_score(findings)
+        findings.extend(dataforseo_by_category.get(category, ()))
+        # 评分和报告中的计数共用同一次按严重程度的计数
+        severity_counts = Counter(f.severity for f in findings)
+        score = calculate_score(findings, severity_counts)
         grade = score_to_grade(score)
         cat_report = CategoryReport(
             category=category,
             score=score,
             grade=grade,
             findings=findings,
+            severity_counts=severity_counts,
         )
         categories.append(cat_report)
         print(f"  {category.value}: {score} 分 ({grade})")
@@ -116,11 +140,16 @@ DataForSEO API:
     parser.add_argument("url", help="目标网站 URL")
     parser.add_argument("--max-pages", type=int, default=50, help="最大爬取页面数（默认 50）")
     parser.add_argument("--delay", type=float, default=1.0, help="请求间隔秒数（默认 1.0）")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发请求数（默认 4，同一域名仍按 --delay 限速）")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="HTML 解析进程数（默认 0，在抓取线程内解析；大站点可设为 CPU 核数）")
     parser.add_argument("-o", "--output", default="", help="报告输出路径（默认 reports/时间戳_tenmomo.html）")
     parser.add_argument("--dataforseo-login", default="",
                         help="DataForSEO API 登录名（或设置 DATAFORSEO_LOGIN 环境变量）")
     parser.add_argument("--dataforseo-password", default="",
                         help="DataForSEO API 密码（或设置 DATAFORSEO_PASSWORD 环境变量）")
+    parser.add_argument("--dataforseo-cache", default="",
+                        help="DataForSEO 响应缓存目录（如 ~/.cache/dataforseo，24 小时内重复分析不再计费）")
 
     args = parser.parse_args()
 
@@ -134,14 +163,15 @@ DataForSEO API:
     # 默认输出到 reports/ 目录，时间戳命名
     output = args.output
     if not output:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        reports_dir = os.path.join(script_dir, "reports")
-        os.makedirs(reports_dir, exist_ok=True)
+        _REPORTS_DIR.mkdir(exist_ok=True)
         domain = urlparse(args.url).netloc.replace(".", "_")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output = os.path.join(reports_dir, f"{timestamp}_{domain}.html")
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
+        output = str(_REPORTS_DIR / f"{timestamp}_{domain}.html")
+
+    dfs_cache = os.path.expanduser(args.dataforseo_cache) if args.dataforseo_cache else ""
 
-    run_analysis(args.url, args.max_pages, args.delay, output, dfs_login, dfs_password)
+    run_analysis(args.url, args.max_pages, args.delay, output, dfs_login, dfs_password, dfs_cache,
+                 concurrency=args.concurrency, parse_workers=args.parse_workers)
 
 
 if __name__ == "__main__":
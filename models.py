@@ -1,26 +1,46 @@
 """数据结构定义"""
 
-from dataclasses import dataclass, field
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import InitVar, dataclass, field
 from enum import Enum
 from typing import Optional
+import sys
 import time
 
 
-class Severity(Enum):
+class Severity(str, Enum):
     GOOD = "good"
     INFO = "info"
     WARNING = "warning"
     ERROR = "error"
 
 
-class Category(Enum):
+class Category(str, Enum):
     SEO = "SEO"
     PERFORMANCE = "性能"
     CONTENT = "内容"
     SECURITY = "安全"
 
 
-@dataclass
+# 报告中各严重程度对应的图标
+_SEVERITY_ICONS = {
+    Severity.GOOD: "✓",
+    Severity.INFO: "i",
+    Severity.WARNING: "!",
+    Severity.ERROR: "✕",
+}
+
+
+# PageData 中解析后只读的序列字段，freeze() 时转为 tuple
+_FROZEN_FIELDS = (
+    "h1_tags", "h2_tags", "h3_tags", "images", "internal_links", "external_links",
+    "scripts", "stylesheets", "json_ld", "mixed_http_resources", "html_comments",
+    "debug_flags",
+)
+
+
+@dataclass(slots=True)
 class PageData:
     """单个页面的爬取数据"""
     url: str
@@ -28,27 +48,39 @@ class PageData:
     content_type: str = ""
     html: str = ""
     headers: dict = field(default_factory=dict)
+    headers_lower: dict = field(default_factory=dict)  # 键统一小写，供分析器直接查找
     response_time: float = 0.0  # 秒
     content_length: int = 0  # 字节
     title: str = ""
     meta_description: str = ""
-    h1_tags: list[str] = field(default_factory=list)
-    h2_tags: list[str] = field(default_factory=list)
-    h3_tags: list[str] = field(default_factory=list)
-    images: list[dict] = field(default_factory=list)  # [{"src": ..., "alt": ...}]
-    internal_links: list[str] = field(default_factory=list)
-    external_links: list[str] = field(default_factory=list)
-    scripts: list[str] = field(default_factory=list)
-    stylesheets: list[str] = field(default_factory=list)
+    h1_tags: Sequence[str] = field(default_factory=list)
+    h2_tags: Sequence[str] = field(default_factory=list)
+    h3_tags: Sequence[str] = field(default_factory=list)
+    images: Sequence[dict] = field(default_factory=list)  # [{"src": ..., "alt": ...}]
+    internal_links: Sequence[str] = field(default_factory=list)
+    external_links: Sequence[str] = field(default_factory=list)
+    scripts: Sequence[str] = field(default_factory=list)
+    stylesheets: Sequence[str] = field(default_factory=list)
     canonical_url: str = ""
     og_tags: dict = field(default_factory=dict)
-    json_ld: list[dict] = field(default_factory=list)
+    json_ld: Sequence[dict] = field(default_factory=list)
     word_count: int = 0
+    # 解析时顺带提取，供安全分析复用，避免再用正则扫描整页 HTML
+    mixed_http_resources: Sequence[str] = field(default_factory=list)  # src/href/action 指向 http:// 的资源
+    html_comments: Sequence[str] = field(default_factory=list)  # 首页的 HTML 注释内容（不含 <!-- -->，其他页面不收集）
+    debug_flags: Sequence[str] = field(default_factory=list)  # 首页出现的调试开关："debug" / "APP_DEBUG"（其他页面不扫描）
     crawled_at: float = field(default_factory=time.time)
     error: str = ""
 
+    def freeze(self):
+        """解析完成后调用：只读的列表字段转为 tuple，多页重复的字符串驻留"""
+        for name in _FROZEN_FIELDS:
+            setattr(self, name, tuple(getattr(self, name)))
+        self.title = sys.intern(self.title)
+        self.canonical_url = sys.intern(self.canonical_url)
 
-@dataclass
+
+@dataclass(slots=True)
 class Finding:
     """单条分析发现"""
     category: Category
@@ -58,29 +90,44 @@ class Finding:
     recommendation: str = ""
     url: str = ""  # 相关页面 URL（可选）
 
+    @property
+    def icon(self) -> str:
+        """报告中的严重程度图标"""
+        return _SEVERITY_ICONS[self.severity]
+
 
-@dataclass
+@dataclass(slots=True)
 class CategoryReport:
     """单个维度的分析报告"""
     category: Category
     score: int  # 0-100
     grade: str  # A/B/C/D/F
-    findings: list[Finding] = field(default_factory=list)
+    findings: Sequence[Finding] = field(default_factory=tuple)  # 构造后转为 tuple，不可再修改
+    # 调用方已按严重程度计数时可直接传入（须与 findings 一致），否则构造时统计一次
+    severity_counts: InitVar[Counter | None] = None
+    _severity_counts: Counter = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self, severity_counts: Counter | None):
+        # findings 固定为 tuple，计数在构造后始终与之一致
+        self.findings = tuple(self.findings)
+        if severity_counts is None:
+            severity_counts = Counter(f.severity for f in self.findings)
+        self._severity_counts = severity_counts
 
     @property
     def error_count(self) -> int:
-        return sum(1 for f in self.findings if f.severity == Severity.ERROR)
+        return self._severity_counts[Severity.ERROR]
 
     @property
     def warning_count(self) -> int:
-        return sum(1 for f in self.findings if f.severity == Severity.WARNING)
+        return self._severity_counts[Severity.WARNING]
 
     @property
     def good_count(self) -> int:
-        return sum(1 for f in self.findings if f.severity == Severity.GOOD)
+        return self._severity_counts[Severity.GOOD]
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisReport:
     """完整分析报告"""
     target_url: str
@@ -1,15 +1,16 @@
 """HTML 报告生成（Jinja2 模板，内联 CSS，单文件输出）"""
 
-from jinja2 import Template
+from jinja2 import DictLoader, Environment, select_autoescape
 from models import AnalysisReport, Severity
+from utils import format_duration
 
-TEMPLATE = Template('''<!DOCTYPE html>
+_TEMPLATE_SRC = '''<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>桃桃护法 - {{ report.target_url }} 分析报告</title>
-<style>
+<style>{% raw %}
 * { margin: 0; padding: 0; box-sizing: border-box; }
 body {
     font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "PingFang SC", "Microsoft YaHei", sans-serif;
@@ -176,7 +177,7 @@ body {
     .score-circle { width: 120px; height: 120px; }
     .score-circle .number { font-size: 2.2em; }
 }
-</style>
+{% endraw %}</style>
 </head>
 <body>
 <div class="container">
@@ -185,7 +186,7 @@ body {
     <h1>🍑 桃桃护法</h1>
     <div class="subtitle">网站分析报告 — {{ report.target_url }}</div>
     <div class="meta">
-        爬取 {{ report.total_pages }} 个页面 · 耗时 {{ duration }} · {{ report.generated_at }}
+        爬取 {{ report.total_pages }} 个页面 · 耗时 {{ report.crawl_duration|duration }} · {{ report.generated_at }}
     </div>
 </div>
 
@@ -197,28 +198,28 @@ body {
 </div>
 
 <div class="score-cards">
-{% for cat in report.categories %}
+{% for view in cat_views %}{% set cat = view.cat %}
     <div class="score-card">
-        <div class="cat-name">{{ cat.category.value }}</div>
+        <div class="cat-name">{{ view.name }}</div>
         <div class="cat-score text-{{ cat.grade }}">{{ cat.score }}</div>
         <div class="cat-grade badge-{{ cat.grade }}">{{ cat.grade }} 级</div>
         <div class="cat-counts">
-            ✅ {{ cat.good_count }}　⚠️ {{ cat.warning_count }}　❌ {{ cat.error_count }}
+            ✅ {{ view.good }}　⚠️ {{ view.warning }}　❌ {{ view.error }}
         </div>
     </div>
 {% endfor %}
 </div>
 
-{% for cat in report.categories %}
+{% for view in cat_views %}{% set cat = view.cat %}
 <div class="section">
     <div class="section-header">
-        <h2>{{ cat.category.value }} 分析</h2>
+        <h2>{{ view.name }} 分析</h2>
         <span class="section-badge badge-{{ cat.grade }}">{{ cat.score }} 分 · {{ cat.grade }} 级</span>
     </div>
     {% for f in cat.findings %}
     <div class="finding">
         <div class="finding-icon icon-{{ f.severity.value }}">
-            {% if f.severity.value == "good" %}✓{% elif f.severity.value == "info" %}i{% elif f.severity.value == "warning" %}!{% else %}✕{% endif %}
+            {{ f.icon }}
         </div>
         <div class="finding-body">
             <div class="finding-title">{{ f.title }}</div>
@@ -242,16 +243,37 @@ body {
 
 </div>
 </body>
-</html>''')
+</html>'''
+
+# 模板在导入时编译一次；按 .html 后缀开启自动转义，爬取到的标题等内容不会被当作 HTML 注入报告
+_ENV = Environment(
+    loader=DictLoader({"report.html": _TEMPLATE_SRC}),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+# 格式化函数注册为过滤器，须在编译模板前注册
+_ENV.filters["duration"] = format_duration
+TEMPLATE = _ENV.get_template("report.html")
 
 
 def generate_report(report: AnalysisReport, output_path: str):
     """生成 HTML 报告"""
-    from utils import format_duration
-    html = TEMPLATE.render(
-        report=report,
-        duration=format_duration(report.crawl_duration),
-    )
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    # 模板中两处遍历维度共用的数据，在 Python 侧一次算好
+    cat_views = [
+        {
+            "cat": cat,
+            "name": cat.category.value,
+            "good": cat.good_count,
+            "warning": cat.warning_count,
+            "error": cat.error_count,
+        }
+        for cat in report.categories
+    ]
+    # 流式渲染直接写入文件，不在内存中拼出完整 HTML 字符串；
+    # 由 Jinja 逐块编码为 UTF-8 写入二进制文件，跳过 TextIOWrapper 的编码层
+    with open(output_path, "wb") as f:
+        TEMPLATE.stream(
+            report=report,
+            cat_views=cat_views,
+        ).dump(f, encoding="utf-8")
     print(f"📄 报告已生成: {output_path}")
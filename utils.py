@@ -1,17 +1,46 @@
 """工具函数"""
 
+import json
+import time
+from collections import Counter
+from functools import lru_cache
 from urllib.parse import urlparse, urljoin, urldefrag
 from models import Severity
-from datetime import datetime
 
+try:
+    import orjson
 
+    # orjson 的 JSONDecodeError 是 json.JSONDecodeError 的子类，调用方统一捕获后者即可
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:  # orjson 为可选依赖，缺失时回落到标准库
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+# 非 HTML 资源的扩展名，爬取时跳过
+_SKIP_EXTENSIONS = (
+    '.pdf', '.zip', '.rar', '.gz', '.tar',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
+    '.mp3', '.mp4', '.avi', '.mov', '.wmv',
+    '.css', '.js', '.woff', '.woff2', '.ttf', '.eot',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+)
+
+
+# 同一 URL（尤其是 base_url）会被反复解析；ParseResult 是不可变的 namedtuple，可安全共享
+_urlparse = lru_cache(maxsize=8192)(urlparse)
+
+
+@lru_cache(maxsize=16384)
 def normalize_url(url: str, base_url: str = "") -> str:
     """标准化 URL：去掉 fragment，确保绝对路径"""
     if base_url:
         url = urljoin(base_url, url)
     url, _ = urldefrag(url)
     # 去掉尾部斜杠（首页除外）
-    parsed = urlparse(url)
+    parsed = _urlparse(url)
     if parsed.path and parsed.path != "/" and parsed.path.endswith("/"):
         url = url.rstrip("/")
     return url
@@ -20,34 +49,25 @@ def normalize_url(url: str, base_url: str = "") -> str:
 def is_same_domain(url: str, base_url: str) -> bool:
     """判断 URL 是否属于同一域名"""
     try:
-        return urlparse(url).netloc == urlparse(base_url).netloc
+        return _urlparse(url).netloc == _urlparse(base_url).netloc
     except Exception:
         return False
 
 
 def is_crawlable_url(url: str) -> bool:
     """判断 URL 是否可爬取（排除非 HTML 资源）"""
-    skip_extensions = {
-        '.pdf', '.zip', '.rar', '.gz', '.tar',
-        '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
-        '.mp3', '.mp4', '.avi', '.mov', '.wmv',
-        '.css', '.js', '.woff', '.woff2', '.ttf', '.eot',
-        '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-    }
-    parsed = urlparse(url)
-    path_lower = parsed.path.lower()
-    return not any(path_lower.endswith(ext) for ext in skip_extensions)
-
-
-def calculate_score(findings: list) -> int:
-    """根据 findings 计算分数（满分 100）"""
-    score = 100
-    for f in findings:
-        if f.severity == Severity.ERROR:
-            score -= 15
-        elif f.severity == Severity.WARNING:
-            score -= 5
-    return max(0, score)
+    # endswith 接受 tuple，一次 C 调用完成全部后缀比较
+    return not _urlparse(url).path.lower().endswith(_SKIP_EXTENSIONS)
+
+
+def calculate_score(findings: list, counts: Counter | None = None) -> int:
+    """根据 findings 计算分数（满分 100）
+
+    已按严重程度计数时可直接传入 counts，省去再遍历一次 findings。
+    """
+    if counts is None:
+        counts = Counter(f.severity for f in findings)
+    return max(0, 100 - 15 * counts[Severity.ERROR] - 5 * counts[Severity.WARNING])
 
 
 def score_to_grade(score: int) -> str:
@@ -64,14 +84,17 @@ def score_to_grade(score: int) -> str:
         return "F"
 
 
+# 字节单位阈值（从大到小）；字节行不做除法
+_BYTE_UNITS = ((1 << 20, "MB"), (1 << 10, "KB"), (1, "B"))
+
+
 def format_bytes(size: int) -> str:
     """字节数格式化"""
-    if size < 1024:
-        return f"{size} B"
-    elif size < 1024 * 1024:
-        return f"{size / 1024:.1f} KB"
-    else:
-        return f"{size / (1024 * 1024):.1f} MB"
+    for threshold, unit in _BYTE_UNITS:
+        if size >= threshold:
+            return f"{size} {unit}" if threshold == 1 else f"{size / threshold:.1f} {unit}"
+    # 0 及负数
+    return f"{size} B"
 
 
 def format_duration(seconds: float) -> str:
@@ -88,4 +111,4 @@ def format_duration(seconds: float) -> str:
 
 def now_str() -> str:
     """当前时间字符串"""
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())